@@ -0,0 +1 @@
+# Make benchmarks a Python package
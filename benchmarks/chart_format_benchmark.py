@@ -0,0 +1,117 @@
+"""
+Compares the chart output formats (png, png-quantized, svg) on synthetic data:
+chart payload, HTML and PDF size, and the time spent in each render stage.
+
+    python -m benchmarks.chart_format_benchmark --reports 10 --months 36
+
+Needs the usual .env (the HTML stage reads TEMPLATES from settings); no database
+is used. The PDF columns are skipped if WeasyPrint cannot be loaded.
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import make_report_data
+from reports.diagram_generator import CHART_FORMATS, CHART_SETTINGS, generate_all_charts
+from reports.html_generator import generate_html_report
+
+
+def _load_pdf_stage():
+    try:
+        from reports.pdf_generator import render_pdf
+    except (ImportError, OSError) as e:
+        print(f"WeasyPrint unavailable, skipping PDF stage: {e}")
+        return None
+    return render_pdf
+
+
+def run(reports: int, projects: int, users: int, months: int) -> list[dict]:
+    render_pdf = _load_pdf_stage()
+    datasets = [make_report_data(i + 1, projects, users, months, seed=i) for i in range(reports)]
+    original_format = CHART_SETTINGS["format"]
+    results = []
+
+    try:
+        for chart_format in CHART_FORMATS:
+            CHART_SETTINGS["format"] = chart_format
+            # One untimed report so template construction isn't measured
+            generate_all_charts(datasets[0].project_hours, datasets[0].variance, datasets[0].monthly)
+
+            chart_s, html_s, pdf_s = [], [], []
+            chart_bytes, html_bytes, pdf_bytes = [], [], []
+            for data in datasets:
+                t0 = time.perf_counter()
+                charts = generate_all_charts(data.project_hours, data.variance, data.monthly)
+                t1 = time.perf_counter()
+                html = generate_html_report(
+                    manager_name=data.manager_name,
+                    project_hours_df=data.project_hours,
+                    avg_duration_df=data.avg_duration,
+                    variance_df=data.variance,
+                    monthly_df=data.monthly,
+                    charts=charts,
+                )
+                t2 = time.perf_counter()
+                chart_s.append(t1 - t0)
+                html_s.append(t2 - t1)
+                chart_bytes.append(sum(len(chart.data) for chart in charts.values()))
+                html_bytes.append(len(html.encode("utf-8")))
+
+                if render_pdf is not None:
+                    t3 = time.perf_counter()
+                    pdf = render_pdf(html)
+                    pdf_s.append(time.perf_counter() - t3)
+                    pdf_bytes.append(len(pdf))
+
+            results.append({
+                "format": chart_format,
+                "chart_bytes": statistics.median(chart_bytes),
+                "html_bytes": statistics.median(html_bytes),
+                "pdf_bytes": statistics.median(pdf_bytes) if pdf_bytes else None,
+                "charts_ms": statistics.median(chart_s) * 1000,
+                "html_ms": statistics.median(html_s) * 1000,
+                "pdf_ms": statistics.median(pdf_s) * 1000 if pdf_s else None,
+                "total_ms": statistics.median(
+                    [sum(stage) for stage in zip(chart_s, html_s, pdf_s or [0.0] * len(chart_s))]
+                ) * 1000,
+            })
+    finally:
+        CHART_SETTINGS["format"] = original_format
+
+    return results
+
+
+def _fmt(value, unit=""):
+    if value is None:
+        return "-"
+    if unit == "KB":
+        return f"{value / 1024:,.1f}"
+    return f"{value:,.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=10)
+    parser.add_argument("--projects", type=int, default=12)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.reports, args.projects, args.users, args.months)
+
+    print(f"{'format':<15}{'charts KB':>11}{'html KB':>10}{'pdf KB':>10}"
+          f"{'charts ms':>11}{'html ms':>10}{'pdf ms':>10}{'total ms':>10}")
+    for row in results:
+        print(f"{row['format']:<15}{_fmt(row['chart_bytes'], 'KB'):>11}{_fmt(row['html_bytes'], 'KB'):>10}"
+              f"{_fmt(row['pdf_bytes'], 'KB'):>10}{_fmt(row['charts_ms']):>11}{_fmt(row['html_ms']):>10}"
+              f"{_fmt(row['pdf_ms']):>10}{_fmt(row['total_ms']):>10}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares the view fetch engines (read_sql vs Postgres COPY) against the configured
+DATABASE_URL / DATABASE_REPLICA_URL: wall time and peak Python allocation per view,
+fetched in bulk for every manager.
+
+    python -m benchmarks.fetch_benchmark --repeat 5
+
+The copy engine only differs from read_sql on Postgres (psycopg2); elsewhere both
+rows measure read_sql.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from config.settings import settings
+from data.database import connect
+from data.queries import (
+    AVG_COMPLETED_PROJECT_DURATION,
+    FETCH_ENGINES,
+    MONTHLY_PROJECT_HOURS,
+    PROJECT_DURATION_VARIANCE,
+    PROJECT_EMPLOYEE_TOTAL_HOURS,
+    fetch_all_manager_ids,
+    fetch_view_for_managers,
+)
+
+VIEWS = (
+    PROJECT_EMPLOYEE_TOTAL_HOURS,
+    AVG_COMPLETED_PROJECT_DURATION,
+    PROJECT_DURATION_VARIANCE,
+    MONTHLY_PROJECT_HOURS,
+)
+
+
+def _fetch(view: str, manager_ids: list[int]):
+    with connect() as conn:
+        return fetch_view_for_managers(view, manager_ids, conn)
+
+
+def run(repeat: int) -> list[dict]:
+    manager_ids = fetch_all_manager_ids()
+    original_engine = settings.fetch_engine
+    results = []
+
+    try:
+        for engine_name in FETCH_ENGINES:
+            settings.fetch_engine = engine_name
+            for view in VIEWS:
+                _fetch(view, manager_ids)  # warm the pool and the server's caches
+
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    df = _fetch(view, manager_ids)
+                    timings.append(time.perf_counter() - start)
+
+                tracemalloc.start()
+                _fetch(view, manager_ids)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                results.append({
+                    "engine": engine_name,
+                    "view": view,
+                    "rows": len(df),
+                    "median_ms": statistics.median(timings) * 1000,
+                    "min_ms": min(timings) * 1000,
+                    "peak_alloc_kb": peak / 1024,
+                })
+    finally:
+        settings.fetch_engine = original_engine
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    print(f"{'engine':<10}{'view':<34}{'rows':>8}{'median ms':>11}{'min ms':>9}{'peak KB':>10}")
+    for row in results:
+        print(f"{row['engine']:<10}{row['view']:<34}{row['rows']:>8}{row['median_ms']:>11.1f}"
+              f"{row['min_ms']:>9.1f}{row['peak_alloc_kb']:>10,.0f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
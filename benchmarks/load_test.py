@@ -0,0 +1,314 @@
+"""
+Load generator for a running REST app (main.py) or gRPC server (server.grpc_server).
+Runs a fixed number of concurrent clients for --duration seconds per concurrency
+level and reports throughput, latency percentiles and error rates per level and per
+operation. Sweep the concurrency to find where throughput stops growing and
+latency climbs, i.e. where the gRPC ThreadPoolExecutor or uvicorn saturates.
+
+    python -m benchmarks.load_test grpc --concurrency 1,2,4,8,16 --mix html=6,pdf=3,all=1 --manager-ids 1-100
+    python -m benchmarks.load_test rest --target http://localhost:8000 --concurrency 8 --distribution zipf
+
+Operations: html (GetManagerHTML, GET /reports/manager/{id}/html), pdf (GetManagerPDF or
+StreamManagerPDF with --stream-pdf, GET /reports/manager/{id}/pdf) and all
+(GetAllManagerReports, POST /reports/managers/batch, read to the end). Manager ids are
+drawn uniformly, Zipf-skewed towards the first ids (hot managers, mostly cache hits)
+or round-robin. Exits with status 1 when a level's error rate exceeds --max-error-rate.
+Point it at a staging or benchmark server, not production.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import grpc
+import numpy as np
+
+from config.settings import settings
+from server.generated import report_pb2, report_pb2_grpc
+from server.grpc_client import auth_metadata, create_channel, manager_request, stream_manager_pdf
+
+OPERATIONS = ("html", "pdf", "all")
+DISTRIBUTIONS = ("uniform", "zipf", "sequential")
+
+
+class _Discard:
+    def write(self, data):
+        pass
+
+
+class RestClient:
+    """
+    One keep-alive HTTP connection per load worker. Returns (status, bytes received).
+    """
+    def __init__(self, base_url: str, timeout: float):
+        url = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(url.hostname, url.port, timeout=timeout)
+        self.prefix = url.path.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {settings.api_key}"}
+
+    def call(self, operation: str, manager_id: int) -> tuple[str, int]:
+        if operation == "all":
+            method, path = "POST", "/reports/managers/batch"
+        else:
+            method, path = "GET", f"/reports/manager/{manager_id}/{operation}"
+        try:
+            self.connection.request(method, self.prefix + path, headers=self.headers)
+            response = self.connection.getresponse()
+            received = len(response.read())
+        except Exception:
+            self.connection.close()  # reconnects on the next request
+            raise
+        return str(response.status), received
+
+    def close(self):
+        self.connection.close()
+
+
+class GrpcClient:
+    """
+    Calls on one channel shared by all workers (gRPC channels are thread-safe).
+    Returns (status code name, bytes received).
+    """
+    def __init__(self, channel: grpc.Channel, timeout: float, stream_pdf: bool, compact: bool):
+        self.stub = report_pb2_grpc.ReportServiceStub(channel)
+        self.timeout = timeout
+        self.stream_pdf = stream_pdf
+        self.compact = compact
+
+    def call(self, operation: str, manager_id: int) -> tuple[str, int]:
+        try:
+            if operation == "all":
+                response = self.stub.GetAllManagerReports(
+                    report_pb2.EmptyRequest(compact=self.compact), metadata=auth_metadata(), timeout=self.timeout)
+                received = response.ByteSize()
+            elif operation == "pdf" and self.stream_pdf:
+                _, received = stream_manager_pdf(self.stub, manager_request(manager_id), _Discard())
+            elif operation == "pdf":
+                response = self.stub.GetManagerPDF(
+                    manager_request(manager_id), metadata=auth_metadata(), timeout=self.timeout)
+                received = len(response.pdf)
+            else:
+                response = self.stub.GetManagerHTML(
+                    manager_request(manager_id), metadata=auth_metadata(), timeout=self.timeout)
+                received = len(response.html.encode("utf-8"))
+        except grpc.RpcError as e:
+            return e.code().name, 0
+        return "OK", received
+
+    def close(self):
+        pass
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """
+    "html=6,pdf=3,all=1" -> relative weights per operation.
+    """
+    mix = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        operation, _, weight = item.partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}; expected one of {OPERATIONS}")
+        mix[operation] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The request mix needs at least one operation with a positive weight")
+    return mix
+
+
+def parse_manager_ids(spec: str) -> list[int]:
+    """
+    "1-100,250,300-310" -> [1, 2, ..., 100, 250, 300, ..., 310]
+    """
+    ids = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        first, _, last = item.partition("-")
+        ids.extend(range(int(first), int(last or first) + 1))
+    if not ids:
+        raise ValueError("No manager ids given")
+    return ids
+
+
+def manager_picker(manager_ids: list[int], distribution: str, zipf_s: float, rng: random.Random):
+    if distribution == "sequential":
+        cycle = itertools.cycle(manager_ids)
+        return lambda: next(cycle)
+    if distribution == "zipf":
+        weights = np.cumsum(1.0 / np.arange(1, len(manager_ids) + 1) ** zipf_s).tolist()
+        return lambda: rng.choices(manager_ids, cum_weights=weights)[0]
+    return lambda: rng.choice(manager_ids)
+
+
+def _is_error(status: str) -> bool:
+    if status.isdigit():
+        return int(status) >= 400
+    return status != "OK"
+
+
+def _worker(client, mix: dict[str, float], pick_manager, rng: random.Random, deadline: float, samples: list):
+    operations, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        manager_id = pick_manager()
+        start = time.perf_counter()
+        try:
+            status, received = client.call(operation, manager_id)
+        except Exception as e:
+            status, received = type(e).__name__, 0
+        end = time.perf_counter()
+        samples.append((operation, status, start, end, received))
+
+
+def _summary(samples: list, window: float) -> dict:
+    latencies = [end - start for _, _, start, end, _ in samples]
+    statuses = Counter(status for _, status, _, _, _ in samples)
+    errors = sum(count for status, count in statuses.items() if _is_error(status))
+    summary = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_per_s": (len(samples) - errors) / window,
+        "received_mb_per_s": sum(received for *_, received in samples) / window / (1024 * 1024),
+        "statuses": dict(statuses),
+    }
+    if latencies:
+        for percentile in (50, 90, 95, 99):
+            summary[f"p{percentile}_ms"] = float(np.percentile(latencies, percentile)) * 1000
+        summary["max_ms"] = max(latencies) * 1000
+    return summary
+
+
+def run_level(make_client, concurrency: int, duration: float, warmup: float, mix: dict[str, float],
+              manager_ids: list[int], distribution: str, zipf_s: float, seed: int) -> dict:
+    """
+    `concurrency` workers for warmup + duration seconds. Only requests started after
+    the warmup count.
+    """
+    start = time.perf_counter()
+    measured_from, deadline = start + warmup, start + warmup + duration
+    samples = [[] for _ in range(concurrency)]
+    clients, threads = [], []
+    for i in range(concurrency):
+        rng = random.Random(seed * 1000 + i)
+        client = make_client()
+        clients.append(client)
+        picker = manager_picker(manager_ids, distribution, zipf_s, rng)
+        threads.append(threading.Thread(
+            target=_worker, args=(client, mix, picker, rng, deadline, samples[i]), daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for client in clients:
+        client.close()
+
+    # Requests still running at the deadline finish late; measure over the real window
+    measured = [sample for worker in samples for sample in worker if sample[2] >= measured_from]
+    window = max((sample[3] for sample in measured), default=deadline) - measured_from
+    by_operation = defaultdict(list)
+    for sample in measured:
+        by_operation[sample[0]].append(sample)
+
+    return {
+        "concurrency": concurrency,
+        **_summary(measured, window),
+        "operations": {operation: _summary(values, window) for operation, values in by_operation.items()},
+    }
+
+
+def print_levels(levels: list[dict]):
+    print(f"{'conc':>5}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p90 ms':>10}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'MB/s':>8}")
+    for level in levels:
+        print(f"{level['concurrency']:>5}{level['requests']:>10}{level['error_rate']:>8.1%}"
+              f"{level['throughput_per_s']:>9.2f}{level.get('p50_ms', 0):>10,.0f}{level.get('p90_ms', 0):>10,.0f}"
+              f"{level.get('p95_ms', 0):>10,.0f}{level.get('p99_ms', 0):>10,.0f}{level.get('max_ms', 0):>10,.0f}"
+              f"{level['received_mb_per_s']:>8.2f}")
+        for operation, summary in sorted(level["operations"].items()):
+            print(f"{'':>5}  {operation:<6}{summary['requests']:>7}{summary['error_rate']:>8.1%}"
+                  f"{summary['throughput_per_s']:>9.2f}{summary.get('p50_ms', 0):>10,.0f}"
+                  f"{summary.get('p90_ms', 0):>10,.0f}{summary.get('p95_ms', 0):>10,.0f}"
+                  f"{summary.get('p99_ms', 0):>10,.0f}{summary.get('max_ms', 0):>10,.0f}")
+        failures = {status: count for status, count in level["statuses"].items() if _is_error(status)}
+        if failures:
+            print(f"{'':>5}  errors: {failures}")
+
+    if len(levels) > 1:
+        best = max(levels, key=lambda level: level["throughput_per_s"])
+        print(f"Peak throughput {best['throughput_per_s']:.2f} req/s at concurrency {best['concurrency']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transport", choices=("rest", "grpc"))
+    parser.add_argument("--target", help="gRPC host:port or REST base URL (default: GRPC_HOST:GRPC_PORT, as main.py)")
+    parser.add_argument("--concurrency", default="4", help="concurrent clients; a comma-separated list runs a sweep")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before each level")
+    parser.add_argument("--mix", default="html=1,pdf=1", help="operation weights, e.g. html=6,pdf=3,all=1")
+    parser.add_argument("--manager-ids", default="1-10", help="e.g. 1-100 or 3,5,8-12")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent; higher is more skewed")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--stream-pdf", action="store_true", help="gRPC pdf via StreamManagerPDF")
+    parser.add_argument("--compact", action="store_true", help="gRPC all-reports in compact mode")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="exit with status 1 if any level has a higher error rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        manager_ids = parse_manager_ids(args.manager_ids)
+        levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    except ValueError as e:
+        parser.error(str(e))
+
+    channel: Optional[grpc.Channel] = None
+    if args.transport == "grpc":
+        channel = create_channel(args.target)
+        make_client = lambda: GrpcClient(channel, args.timeout, args.stream_pdf, args.compact)
+    else:
+        base_url = args.target or f"http://{settings.grpc_host}:{settings.grpc_port}"
+        make_client = lambda: RestClient(base_url, args.timeout)
+
+    results = []
+    try:
+        for concurrency in levels:
+            print(f"{args.transport}: concurrency {concurrency} for {args.duration:g}s...", flush=True)
+            results.append(run_level(make_client, concurrency, args.duration, args.warmup, mix,
+                                     manager_ids, args.distribution, args.zipf_s, args.seed))
+    finally:
+        if channel is not None:
+            channel.close()
+
+    print_levels(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"args": vars(args), "levels": results}, indent=2))
+
+    # Fast failures look like high throughput; a run with many errors measured nothing useful
+    failed = [level for level in results if level["error_rate"] > args.max_error_rate]
+    for level in failed:
+        failures = {status: count for status, count in level["statuses"].items() if _is_error(status)}
+        print(f"FAILED: concurrency {level['concurrency']}: {level['error_rate']:.1%} of requests failed "
+              f"(limit {args.max_error_rate:.1%}): {failures}", file=sys.stderr)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+End-to-end benchmark of the report pipeline against the configured database (seed
+a scratch one with benchmarks.seed): per-stage timings of generate_manager_report
+for the first --managers managers, the same managers through the REST html and pdf
+routes (async engine and render pool, called in-process without HTTP), then the
+full GetAllManagerReports, with throughput, p50/p95 latency and peak RSS. Results
+are written as JSON so runs can be compared across commits.
+
+    python -m benchmarks.pipeline_benchmark --managers 20 --json bench/$(git rev-parse --short HEAD).json
+    python -m benchmarks.pipeline_benchmark --managers 20 --compare bench/abc1234.json
+
+The report cache is off unless --cache is given, so every report is fetched and
+rendered. Stage timings come from telemetry.metrics; GetAllManagerReports renders
+on the batch worker processes, so only its total is measured.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from config.settings import settings
+from data.async_queries import dispose_async_engine
+from data.database import engine
+from data.queries import fetch_all_manager_ids
+from reports.batch_generator import shutdown_workers
+from reports.report_generator import ALL_OUTPUTS, generate_manager_report
+from server.generated import report_pb2
+from server.rest_router import get_manager_html, get_manager_pdf
+from server.service_impl import ReportServiceServicer
+from telemetry.metrics import collect_stages
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _summary(seconds: list[float]) -> dict:
+    return {
+        "count": len(seconds),
+        "p50_ms": float(np.percentile(seconds, 50)) * 1000,
+        "p95_ms": float(np.percentile(seconds, 95)) * 1000,
+        "mean_ms": statistics.fmean(seconds) * 1000,
+        "max_ms": max(seconds) * 1000,
+    }
+
+
+def _peak_rss_mb(who) -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_single(manager_ids: list[int], outputs, repeat: int) -> dict:
+    """
+    generate_manager_report for each manager in turn, `repeat` times.
+    """
+    generate_manager_report(manager_ids[0], outputs=outputs)  # fonts, templates, connection pool
+
+    latencies, stages = [], defaultdict(list)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for manager_id in manager_ids:
+            with collect_stages() as report_stages:
+                t0 = time.perf_counter()
+                generate_manager_report(manager_id, outputs=outputs)
+                latencies.append(time.perf_counter() - t0)
+            for name, seconds in report_stages.items():
+                stages[name].append(seconds)
+    wall = time.perf_counter() - started
+
+    return {
+        "reports": len(latencies),
+        "throughput_per_s": len(latencies) / wall,
+        "latency": _summary(latencies),
+        "stages": {name: _summary(values) for name, values in stages.items()},
+    }
+
+
+async def _call_route(route, manager_id: int, credentials) -> int:
+    response = await route(manager_id, if_none_match=None, report_filter=None, credentials=credentials)
+    if isinstance(response, StreamingResponse):
+        return sum([len(chunk) async for chunk in response.body_iterator])
+    return len(response.body)
+
+
+async def _run_rest(manager_ids: list[int], repeat: int) -> dict:
+    routes = {"html": get_manager_html, "pdf": get_manager_pdf}
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=settings.api_key)
+    try:
+        for route in routes.values():
+            await _call_route(route, manager_ids[0], credentials)  # async engine and render pool
+
+        latencies, stages = defaultdict(list), defaultdict(list)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for manager_id in manager_ids:
+                for name, route in routes.items():
+                    with collect_stages() as request_stages:
+                        t0 = time.perf_counter()
+                        await _call_route(route, manager_id, credentials)
+                        latencies[name].append(time.perf_counter() - t0)
+                    for stage_name, seconds in request_stages.items():
+                        stages[stage_name].append(seconds)
+        wall = time.perf_counter() - started
+    finally:
+        await dispose_async_engine()
+
+    return {
+        "requests": sum(len(values) for values in latencies.values()),
+        "throughput_per_s": sum(len(values) for values in latencies.values()) / wall,
+        "routes": {name: _summary(values) for name, values in latencies.items()},
+        "stages": {name: _summary(values) for name, values in stages.items()},
+    }
+
+
+def run_rest(manager_ids: list[int], repeat: int) -> dict:
+    """
+    The REST html and pdf route handlers for each manager in turn, `repeat` times.
+    """
+    return asyncio.run(_run_rest(manager_ids, repeat))
+
+
+def run_all_manager_reports(repeat: int) -> dict:
+    """
+    The GetAllManagerReports RPC in-process (bulk fetch + batch worker pool), `repeat`
+    times. The first run includes starting the worker processes.
+    """
+    service = ReportServiceServicer()
+
+    timings, response = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = service.GetAllManagerReports(report_pb2.EmptyRequest(), None)
+        timings.append(time.perf_counter() - t0)
+
+    return {
+        "reports": len(response.reports),
+        "throughput_per_s": len(response.reports) / statistics.median(timings),
+        "latency": _summary(timings),
+        "message_bytes": response.ByteSize(),
+    }
+
+
+def run(managers: int, repeat: int, outputs, rest_repeat: int, all_repeat: int) -> dict:
+    manager_ids = sorted(fetch_all_manager_ids())
+    if not manager_ids:
+        raise SystemExit("No managers found; seed the database with python -m benchmarks.seed first")
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": engine.dialect.name,
+            "managers_in_database": len(manager_ids),
+            "outputs": sorted(outputs),
+            "settings": {
+                name: getattr(settings, name)
+                for name in (
+                    "report_cache_enabled", "fetch_engine", "summary_tables_enabled", "chart_format",
+                    "chart_max_months", "chart_top_projects", "report_workers", "report_chunk_size",
+                )
+            },
+        },
+        "single_manager": run_single(manager_ids[:managers], outputs, repeat),
+    }
+    if rest_repeat:
+        results["rest"] = run_rest(manager_ids[:managers], rest_repeat)
+    results["peak_rss_mb"] = {"main": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None}
+
+    if all_repeat:
+        results["all_manager_reports"] = run_all_manager_reports(all_repeat)
+        shutdown_workers(wait=True)  # so the workers' peak RSS is counted
+        results["peak_rss_mb"] = {
+            "main": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            "workers": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+        }
+    return results
+
+
+def _metrics(results: dict) -> dict[str, float]:
+    """Flat {name: value} of the figures worth comparing between runs."""
+    single = results["single_manager"]
+    flat = {
+        "single throughput/s": single["throughput_per_s"],
+        "single p50 ms": single["latency"]["p50_ms"],
+        "single p95 ms": single["latency"]["p95_ms"],
+    }
+    for name, summary in single["stages"].items():
+        flat[f"{name} p50 ms"] = summary["p50_ms"]
+        flat[f"{name} p95 ms"] = summary["p95_ms"]
+    if "rest" in results:
+        flat["rest throughput/s"] = results["rest"]["throughput_per_s"]
+        for name, summary in results["rest"]["routes"].items():
+            flat[f"rest {name} p50 ms"] = summary["p50_ms"]
+            flat[f"rest {name} p95 ms"] = summary["p95_ms"]
+    if "all_manager_reports" in results:
+        flat["all reports throughput/s"] = results["all_manager_reports"]["throughput_per_s"]
+        flat["all reports p50 ms"] = results["all_manager_reports"]["latency"]["p50_ms"]
+    for name, value in results.get("peak_rss_mb", {}).items():
+        if value is not None:
+            flat[f"peak rss {name} MB"] = value
+    return flat
+
+
+def print_results(results: dict, baseline: dict | None = None):
+    current = _metrics(results)
+    before = _metrics(baseline) if baseline else {}
+    header = f"{'metric':<30}{'value':>12}"
+    if baseline:
+        header += f"{'baseline':>12}{'change':>9}"
+    print(header)
+    for name, value in current.items():
+        line = f"{name:<30}{value:>12,.1f}"
+        if name in before:
+            change = (value - before[name]) / before[name] * 100 if before[name] else 0.0
+            line += f"{before[name]:>12,.1f}{change:>+8.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--managers", type=int, default=10, help="managers rendered one by one")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--outputs", default=",".join(sorted(ALL_OUTPUTS)), help="comma-separated: html,pdf,charts")
+    parser.add_argument("--rest-repeat", type=int, default=1, help="REST route runs (0 to skip)")
+    parser.add_argument("--all-repeat", type=int, default=1, help="GetAllManagerReports runs (0 to skip)")
+    parser.add_argument("--cache", action="store_true", help="keep the report cache enabled")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    if not args.cache:
+        settings.report_cache_enabled = False
+        os.environ["REPORT_CACHE_ENABLED"] = "false"  # for the batch worker processes
+    settings.timing_log_enabled = False
+
+    outputs = {output.strip() for output in args.outputs.split(",") if output.strip()}
+    results = run(args.managers, args.repeat, outputs, args.rest_repeat, args.all_repeat)
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_results(results, baseline)
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measures the gRPC ManagerReport message for a typical manager in both wire modes:
+self-contained (charts base64-embedded in the HTML and base64 again in Chart.data)
+and compact (raw Chart.data, cid: references in the HTML), per chart format.
+
+    python -m benchmarks.report_size_benchmark --projects 12 --months 36
+
+Synthetic data, no database; the PDF is left out since it is identical in both modes.
+"""
+import argparse
+import gzip
+import json
+from pathlib import Path
+
+from benchmarks.synthetic import make_report_data
+from dto.report_dto import ReportDTO
+from reports.diagram_generator import CHART_FORMATS, CHART_SETTINGS, generate_all_charts
+from reports.html_generator import generate_html_report
+from server.service_impl import ReportServiceServicer
+
+
+def _render(data) -> ReportDTO:
+    charts = generate_all_charts(data.project_hours, data.variance, data.monthly)
+    html = generate_html_report(
+        manager_name=data.manager_name,
+        project_hours_df=data.project_hours,
+        avg_duration_df=data.avg_duration,
+        variance_df=data.variance,
+        monthly_df=data.monthly,
+        charts=charts,
+    )
+    return ReportDTO(data.manager_id, data.manager_name, html, None, charts, None)
+
+
+def run(projects: int, users: int, months: int) -> list[dict]:
+    service = ReportServiceServicer()
+    data = make_report_data(1, projects, users, months)
+    original_format = CHART_SETTINGS["format"]
+    results = []
+
+    try:
+        for chart_format in CHART_FORMATS:
+            CHART_SETTINGS["format"] = chart_format
+            report = _render(data)
+            for compact in (False, True):
+                packaged = service._package_report(report, compact)
+                message = service._report_message(report.manager_id, report.manager_name, packaged)
+                wire = message.SerializeToString()
+                results.append({
+                    "format": chart_format,
+                    "mode": "compact" if compact else "self-contained",
+                    "html_bytes": len(packaged["html"].encode("utf-8")),
+                    "chart_bytes": sum(len(chart.data) for chart in packaged["charts"]),
+                    "message_bytes": len(wire),
+                    "gzip_bytes": len(gzip.compress(wire)),
+                })
+    finally:
+        CHART_SETTINGS["format"] = original_format
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=12)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.projects, args.users, args.months)
+
+    print(f"{'format':<15}{'mode':<16}{'html KB':>10}{'charts KB':>11}{'message KB':>12}{'gzip KB':>10}")
+    for row in results:
+        print(f"{row['format']:<15}{row['mode']:<16}{row['html_bytes'] / 1024:>10,.1f}"
+              f"{row['chart_bytes'] / 1024:>11,.1f}{row['message_bytes'] / 1024:>12,.1f}"
+              f"{row['gzip_bytes'] / 1024:>10,.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
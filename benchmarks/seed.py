@@ -0,0 +1,225 @@
+"""
+Seeds a scratch database with a synthetic workplanner stand-in: the "User",
+"Project" and time entry tables in a "workplanner" schema and the four reporting
+views over them, at a configurable scale. Same --seed, same data.
+
+    # Postgres: tables in schema workplanner, views in the default schema
+    DATABASE_URL=postgresql+psycopg2://localhost/bench python -m benchmarks.seed --managers 100 --months 36
+
+    # SQLite: one file, attached to itself as "workplanner"
+    DATABASE_URL=sqlite:///bench.db SQLITE_ATTACH=workplanner=bench.db python -m benchmarks.seed --managers 10
+
+Typical scales: 10, 100 and 1,000 managers; --months 6 to 60. Rows are roughly
+managers x projects x team x active months x entries per month.
+
+Only point this at a scratch database: with --replace it drops the workplanner
+tables and the reporting views first. The view definitions approximate the
+production ones with the columns the reports use.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import inspect, text
+
+from config.settings import settings
+from data.database import connect, engine
+from data.queries import REPORT_VIEWS
+
+UPDATED_AT = "2024-12-31 00:00:00"
+INSERT_BATCH = 20_000
+
+
+def _schema(dialect: str) -> str:
+    # SQLite stand-ins keep the tables in the file itself, which SQLITE_ATTACH attaches as "workplanner"
+    return 'workplanner.' if dialect == "postgresql" else ""
+
+
+def _ddl(dialect: str) -> list[str]:
+    wp = _schema(dialect)
+    entries = f'{wp}"{settings.time_entry_table}"'
+    pg = dialect == "postgresql"
+    timestamp = "TIMESTAMP" if pg else "TEXT"
+    day = "DATE" if pg else "TEXT"
+    if pg:
+        month = "date_trunc('month', t.date)::date"
+        days = lambda end, start: f'(p."{end}" - p."{start}")'
+        average = 'AVG(p."endDate" - p."startDate")::double precision'
+    else:
+        month = "date(t.date, 'start of month')"
+        days = lambda end, start: f'CAST(julianday(p."{end}") - julianday(p."{start}") AS INTEGER)'
+        average = 'AVG(julianday(p."endDate") - julianday(p."startDate"))'
+
+    statements = ["CREATE SCHEMA IF NOT EXISTS workplanner"] if pg else []
+    return statements + [
+        f'CREATE TABLE {wp}"User" (id INTEGER PRIMARY KEY, name TEXT NOT NULL, "updatedAt" {timestamp} NOT NULL)',
+        f'CREATE TABLE {wp}"Project" ('
+        f'id INTEGER PRIMARY KEY, name TEXT NOT NULL, "ownerId" INTEGER NOT NULL, '
+        f'"startDate" {day} NOT NULL, "plannedEndDate" {day} NOT NULL, "endDate" {day}, '
+        f'"updatedAt" {timestamp} NOT NULL)',
+        f'CREATE TABLE {entries} ('
+        f'id INTEGER PRIMARY KEY, "projectId" INTEGER NOT NULL, "userId" INTEGER NOT NULL, '
+        f'date {day} NOT NULL, hours DOUBLE PRECISION NOT NULL, "updatedAt" {timestamp} NOT NULL)',
+        f'CREATE INDEX ix_project_owner ON {wp}"Project" ("ownerId")',
+        f'CREATE INDEX ix_time_entry_project ON {entries} ("projectId")',
+
+        f'''CREATE VIEW project_employee_total_hours AS
+            SELECT p."ownerId" AS "managerId", p.id AS "projectId", p.name AS "projectName",
+                   u.name AS "userName", SUM(t.hours) AS "totalHours"
+            FROM {entries} t
+            JOIN {wp}"Project" p ON p.id = t."projectId"
+            JOIN {wp}"User" u ON u.id = t."userId"
+            GROUP BY p."ownerId", p.id, p.name, u.id, u.name''',
+        f'''CREATE VIEW avg_completed_project_duration AS
+            SELECT p."ownerId" AS "managerId", {average} AS "averageProjectDurationDays"
+            FROM {wp}"Project" p
+            WHERE p."endDate" IS NOT NULL
+            GROUP BY p."ownerId"''',
+        f'''CREATE VIEW project_duration_variance AS
+            SELECT p."ownerId" AS "managerId", p.id AS "projectId", p.name AS "projectName",
+                   {days("plannedEndDate", "startDate")} AS "plannedDurationDays",
+                   {days("endDate", "startDate")} AS "actualDurationDays",
+                   {days("endDate", "plannedEndDate")} AS "durationVarianceDays"
+            FROM {wp}"Project" p
+            WHERE p."endDate" IS NOT NULL''',
+        f'''CREATE VIEW monthly_project_hours AS
+            SELECT p."ownerId" AS "managerId", p.id AS "projectId", p.name AS "projectName",
+                   {month} AS month, SUM(t.hours) AS "totalMonthlyHours"
+            FROM {entries} t
+            JOIN {wp}"Project" p ON p.id = t."projectId"
+            GROUP BY p."ownerId", p.id, p.name, {month}''',
+    ]
+
+
+def _drop(conn, dialect: str):
+    wp = _schema(dialect)
+    for view in REPORT_VIEWS:
+        conn.execute(text(f"DROP VIEW IF EXISTS {view}"))
+    for table in (settings.time_entry_table, "Project", "User"):
+        conn.execute(text(f'DROP TABLE IF EXISTS {wp}"{table}"'))
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _month_starts(first: date, last: date) -> list[date]:
+    months, current = [], first.replace(day=1)
+    while current <= last:
+        months.append(current)
+        current = _next_month(current)
+    return months
+
+
+def generate(managers: int, months: int, projects: int, team: int, entries_per_month: int,
+             seed: int, end: date) -> dict[str, list[dict]]:
+    """
+    Rows for the three tables. Managers are users 1..managers; the employees after
+    them are shared across managers. Projects that would finish after `end` are
+    still running (no "endDate").
+    """
+    rng = np.random.default_rng(seed)
+    employees = max(team, managers * team // 2)
+    first_month = (end.year * 12 + end.month - 1) - (months - 1)
+    history_start = date(first_month // 12, first_month % 12 + 1, 1)
+    history_days = (end - history_start).days
+
+    users = [{"id": i, "name": f"Manager {i}", "updatedAt": UPDATED_AT} for i in range(1, managers + 1)]
+    users += [
+        {"id": i, "name": f"Employee {i}", "updatedAt": UPDATED_AT}
+        for i in range(managers + 1, managers + employees + 1)
+    ]
+
+    project_rows, entry_rows = [], []
+    for owner in range(1, managers + 1):
+        for _ in range(projects):
+            project_id = len(project_rows) + 1
+            start = history_start + timedelta(days=int(rng.integers(0, max(1, history_days - 30))))
+            planned = int(rng.integers(30, 240))
+            actual = max(7, int(planned * rng.uniform(0.7, 1.6)))
+            finished = start + timedelta(days=actual)
+            project_rows.append({
+                "id": project_id,
+                "name": f"Project {project_id}",
+                "ownerId": owner,
+                "startDate": start.isoformat(),
+                "plannedEndDate": (start + timedelta(days=planned)).isoformat(),
+                "endDate": finished.isoformat() if finished <= end else None,
+                "updatedAt": UPDATED_AT,
+            })
+
+            members = rng.choice(employees, size=min(team, employees), replace=False) + managers + 1
+            for month in _month_starts(start, min(finished, end)):
+                for user_id in members:
+                    for day in rng.integers(0, 28, size=entries_per_month):
+                        entry_rows.append({
+                            "id": len(entry_rows) + 1,
+                            "projectId": project_id,
+                            "userId": int(user_id),
+                            "date": (month + timedelta(days=int(day))).isoformat(),
+                            "hours": round(float(rng.uniform(0.5, 8.0)), 2),
+                            "updatedAt": UPDATED_AT,
+                        })
+
+    return {"User": users, "Project": project_rows, settings.time_entry_table: entry_rows}
+
+
+def seed(managers: int, months: int, projects: int, team: int, entries_per_month: int,
+         seed: int = 0, end: date = date(2024, 12, 31), replace: bool = False) -> dict:
+    dialect = engine.dialect.name
+    wp = _schema(dialect)
+    started = time.perf_counter()
+    rows = generate(managers, months, projects, team, entries_per_month, seed, end)
+
+    with connect(engine) as conn:
+        with conn.begin():
+            exists = inspect(conn).has_table("Project", schema="workplanner" if wp else None)
+            if exists and not replace:
+                raise SystemExit("workplanner tables already exist; pass --replace to drop and reseed them")
+            _drop(conn, dialect)
+            for statement in _ddl(dialect):
+                conn.execute(text(statement))
+
+            for table, table_rows in rows.items():
+                if not table_rows:
+                    continue
+                columns = list(table_rows[0])
+                names = ", ".join(f'"{column}"' for column in columns)
+                values = ", ".join(f":{column}" for column in columns)
+                insert = text(f'INSERT INTO {wp}"{table}" ({names}) VALUES ({values})')
+                for i in range(0, len(table_rows), INSERT_BATCH):
+                    conn.execute(insert, table_rows[i:i + INSERT_BATCH])
+
+        if dialect == "postgresql":
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+
+    return {
+        "dialect": dialect,
+        "users": len(rows["User"]),
+        "projects": len(rows["Project"]),
+        "time_entries": len(rows[settings.time_entry_table]),
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--managers", type=int, default=10)
+    parser.add_argument("--months", type=int, default=24, help="history length, ending 2024-12")
+    parser.add_argument("--projects", type=int, default=8, help="projects per manager")
+    parser.add_argument("--team", type=int, default=5, help="employees logging hours per project")
+    parser.add_argument("--entries-per-month", type=int, default=4, help="time entries per employee and month")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replace", action="store_true", help="drop existing workplanner tables and views first")
+    args = parser.parse_args()
+
+    result = seed(args.managers, args.months, args.projects, args.team, args.entries_per_month,
+                  seed=args.seed, replace=args.replace)
+    print(f"Seeded {result['dialect']}: {result['users']} users, {result['projects']} projects, "
+          f"{result['time_entries']} time entries in {result['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from dto.report_dto import ReportDataDTO
+
+
+def make_report_data(
+        manager_id: int = 1,
+        projects: int = 12,
+        users: int = 8,
+        months: int = 36,
+        seed: int = 0,
+) -> ReportDataDTO:
+    """
+    In-memory report frames shaped like the four reporting views, for benchmarks
+    that should not depend on a database.
+    """
+    rng = np.random.default_rng(seed)
+    project_names = [f"Project {i + 1}" for i in range(projects)]
+
+    project_hours = pd.DataFrame(
+        [
+            (manager_id, i + 1, name, f"User {u + 1}", round(float(rng.uniform(5, 400)), 2))
+            for i, name in enumerate(project_names)
+            for u in rng.choice(users, size=min(users, 5), replace=False)
+        ],
+        columns=["managerId", "projectId", "projectName", "userName", "totalHours"],
+    )
+
+    planned = rng.integers(20, 120, size=projects)
+    actual = planned + rng.integers(-15, 40, size=projects)
+    variance = pd.DataFrame({
+        "managerId": manager_id,
+        "projectId": range(1, projects + 1),
+        "projectName": project_names,
+        "plannedDurationDays": planned,
+        "actualDurationDays": actual,
+        "durationVarianceDays": actual - planned,
+    })
+
+    avg_duration = pd.DataFrame({
+        "managerId": [manager_id],
+        "averageProjectDurationDays": [float(actual.mean())],
+    })
+
+    start = pd.Timestamp("2020-01-01")
+    monthly = pd.DataFrame(
+        [
+            (manager_id, i + 1, name, start + pd.DateOffset(months=m), round(float(rng.uniform(10, 160)), 2))
+            for m in range(months)
+            for i, name in enumerate(project_names)
+        ],
+        columns=["managerId", "projectId", "projectName", "month", "totalMonthlyHours"],
+    )
+
+    return ReportDataDTO(
+        manager_id=manager_id,
+        manager_name=f"Manager {manager_id}",
+        project_hours=project_hours,
+        avg_duration=avg_duration,
+        variance=variance,
+        monthly=monthly,
+    )
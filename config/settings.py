@@ -5,14 +5,72 @@ from pathlib import Path
 
 class Settings(BaseSettings):
     database_url: str
-    diagrams_path: str
+    database_replica_url: str = ""  # optional read replica; all reporting queries go there when set
+    async_database_url: str = ""  # REST data access; derived from the reporting URL (asyncpg / aiosqlite) when empty
+    diagrams_path: str = ""  # unused: charts are rendered in memory; kept so existing .env files still load
+    chart_format: str = "png"  # png, png-quantized or svg
+    chart_png_colors: int = 64  # palette size for png-quantized
+    chart_max_months: int = 0  # monthly hours chart: latest N months only (0 = all history)
+    chart_top_projects: int = 0  # employee hours chart: N projects with the most hours (0 = all)
     templates: str
-    pdf_path: str
+    pdf_path: str = ""  # unused: PDFs stay in memory; kept so existing .env files still load
     api_key: str
     grpc_host: str
     grpc_port: int
     msys2_dll_path: str
 
+    # gRPC transport, for the server and for channels from server.grpc_client
+    grpc_max_message_mb: int = 64  # max send/receive message size
+    grpc_compression: str = "gzip"  # none, gzip or deflate; PDF chunk streams are sent uncompressed
+    grpc_pdf_chunk_kb: int = 64  # StreamManagerPDF chunk size
+    grpc_metrics_port: int = 0  # Prometheus /metrics of the gRPC server process on this port (0 = off)
+
+    # One JSON line per REST request / gRPC call with its stage timings (logger "report.timing")
+    timing_log_enabled: bool = True
+
+    # Connection pools, per engine and per process (batch workers each get their own)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # How the reporting views are read: "read_sql" (any database) or "copy" (Postgres COPY, typed CSV parse)
+    fetch_engine: str = "read_sql"
+
+    # Summary tables (python -m data.summary_tables refresh) instead of the live views
+    summary_tables_enabled: bool = False
+    summary_refresh_batch: int = 50  # managers recomputed per transaction
+
+    # workplanner table holding logged hours; used by the change-detection probe
+    time_entry_table: str = "TimeEntry"
+
+    # SQLite stand-ins (benchmarks.seed): databases attached to every connection, "schema=path[,schema=path]"
+    sqlite_attach: str = ""
+
+    # Multi-manager batch generation (process pool)
+    report_workers: int = 4
+    report_chunk_size: int = 4
+    report_timeout_seconds: float = 300.0
+
+    # REST render pool: admission control for the blocking report pipeline
+    rest_max_concurrent_renders: int = 4
+    rest_max_queued_renders: int = 16
+    rest_render_timeout_seconds: float = 120.0
+    rest_retry_after_seconds: int = 5
+
+    # Background report jobs (state in SQLite, results on local disk)
+    jobs_dir: str = "job_output"
+    jobs_db_path: str = "job_output/jobs.sqlite3"
+    job_workers: int = 2
+    job_retention_hours: float = 24.0
+
+    # Rendered report cache (in-memory LRU in front of a size-bounded disk LRU)
+    report_cache_enabled: bool = True
+    report_cache_dir: str = "report_cache"
+    report_cache_memory_entries: int = 64
+    report_cache_disk_bytes: int = 512 * 1024 * 1024
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
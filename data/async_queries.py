@@ -0,0 +1,191 @@
+"""
+Async counterparts of data.queries for the FastAPI routes, on SQLAlchemy's async
+engine (asyncpg for Postgres, aiosqlite for SQLite). The SQL is shared with
+data.queries; frames are built by the same read_sql code path, so sync and async
+fetches produce identical frames (and identical report cache keys).
+"""
+import asyncio
+import threading
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from config.settings import settings
+from data.database import attach_sqlite_schemas
+from data.queries import (
+    AVG_COMPLETED_PROJECT_DURATION,
+    MONTHLY_PROJECT_HOURS,
+    PROJECT_DURATION_VARIANCE,
+    PROJECT_EMPLOYEE_TOTAL_HOURS,
+    employee_hours_query,
+    manager_versions_query,
+    monthly_totals_query,
+    read_view_frame,
+    version_tokens,
+    view_by_manager_query,
+)
+from dto.report_dto import ReportDataDTO, ReportFilter
+
+# sync driver -> async driver, for deriving the async URL from the configured one
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def async_database_url() -> str:
+    """
+    ASYNC_DATABASE_URL if set, else the reporting URL (replica first) with its
+    driver swapped for the async one.
+    """
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = make_url(settings.database_replica_url or settings.database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {backend!r}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Created on first use, so processes that never touch the async path (gRPC,
+    batch workers) don't need the async driver installed.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            url = async_database_url()
+            pool_options = {}
+            if make_url(url).get_backend_name() != "sqlite":
+                # aiosqlite defaults to NullPool (StaticPool in memory), which rejects the sizing
+                # arguments; it also opens a thread per pooled connection, so keep its default
+                pool_options = {
+                    "pool_size": settings.db_pool_size,
+                    "max_overflow": settings.db_max_overflow,
+                    "pool_timeout": settings.db_pool_timeout_seconds,
+                    "pool_recycle": settings.db_pool_recycle_seconds,
+                }
+            _engine = create_async_engine(
+                url,
+                pool_pre_ping=settings.db_pool_pre_ping,
+                **pool_options,
+            )
+            attach_sqlite_schemas(_engine.sync_engine)
+        return _engine
+
+
+def async_pool_stats() -> dict:
+    """
+    Pool usage of the async engine, keyed like data.database.pool_stats(); empty
+    until the engine has been created.
+    """
+    if _engine is None:
+        return {}
+    pool = _engine.sync_engine.pool
+    stats = {"pool": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return {"async": stats}
+
+
+async def _read_frame(query, params=None) -> pd.DataFrame:
+    # Each call checks out its own connection, so gathered queries really run in parallel
+    async with get_async_engine().connect() as conn:
+        return await conn.run_sync(lambda sync_conn: read_view_frame(query, sync_conn, params))
+
+
+async def fetch_view_by_manager(name: str, manager_id: int, report_filter: Optional[ReportFilter] = None) -> pd.DataFrame:
+    return await _read_frame(*view_by_manager_query(name, manager_id, report_filter))
+
+
+async def fetch_manager(manager_id: int) -> Optional[str]:
+    query = text('SELECT name FROM "workplanner"."User" WHERE id = :mid')
+    df = await _read_frame(query, {"mid": manager_id})
+    if not df.empty:
+        return str(df.iloc[0, 0])
+    return None
+
+
+async def fetch_all_manager_ids() -> list[int]:
+    query = text('SELECT DISTINCT "ownerId" FROM "workplanner"."Project"')
+    try:
+        df = await _read_frame(query)
+    except Exception as e:
+        print(f"Database error fetching manager IDs: {e}")
+        return []
+    if df.empty:
+        return []
+    return df['ownerId'].astype(int).tolist()
+
+
+async def fetch_manager_versions(manager_ids: Optional[list[int]] = None) -> dict[int, str]:
+    """
+    See data.queries.fetch_manager_versions. Returns {} if the probe fails.
+    """
+    if manager_ids is not None and not manager_ids:
+        return {}
+    query, params = manager_versions_query(manager_ids)
+    try:
+        async with get_async_engine().connect() as conn:
+            rows = (await conn.execute(query, params)).all()
+    except Exception as e:
+        print(f"Database error probing manager versions: {e}")
+        return {}
+    return version_tokens(rows)
+
+
+async def fetch_manager_version(manager_id: int) -> Optional[str]:
+    return (await fetch_manager_versions([manager_id])).get(int(manager_id))
+
+
+async def _optional_frame(enabled: bool, build_query, manager_id: int,
+                          report_filter: Optional[ReportFilter]) -> Optional[pd.DataFrame]:
+    # Chart aggregates are only queried when their limit is configured (see fetch_chart_aggregates_for_managers)
+    if not enabled:
+        return None
+    return await _read_frame(*build_query([manager_id], report_filter))
+
+
+async def fetch_report_data(manager_id: int, report_filter: Optional[ReportFilter] = None) -> ReportDataDTO:
+    """
+    The manager's name, the four views and the chart aggregates, queried concurrently.
+    """
+    queries = [
+        fetch_manager(manager_id),
+        fetch_view_by_manager(PROJECT_EMPLOYEE_TOTAL_HOURS, manager_id, report_filter),
+        fetch_view_by_manager(AVG_COMPLETED_PROJECT_DURATION, manager_id, report_filter),
+        fetch_view_by_manager(PROJECT_DURATION_VARIANCE, manager_id, report_filter),
+        fetch_view_by_manager(MONTHLY_PROJECT_HOURS, manager_id, report_filter),
+        _optional_frame(settings.chart_max_months > 0, monthly_totals_query, manager_id, report_filter),
+        _optional_frame(settings.chart_top_projects > 0, employee_hours_query, manager_id, report_filter),
+    ]
+
+    (manager_name, project_hours, avg_duration, variance, monthly,
+     monthly_totals, employee_hours) = await asyncio.gather(*queries)
+    return ReportDataDTO(
+        manager_id=manager_id,
+        manager_name=manager_name,
+        project_hours=project_hours,
+        avg_duration=avg_duration,
+        variance=variance,
+        monthly=monthly,
+        monthly_totals=monthly_totals,
+        employee_hours=employee_hours,
+        report_filter=report_filter,
+    )
+
+
+async def dispose_async_engine():
+    global _engine
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        await engine.dispose()
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from config.settings import settings
+
+
+def attach_sqlite_schemas(target):
+    """
+    SQLite stand-ins only: ATTACH the SQLITE_ATTACH databases ("schema=path,...")
+    to every new connection of `target`, so "workplanner"."User" etc. resolve.
+    """
+    if target.dialect.name != "sqlite" or not settings.sqlite_attach:
+        return
+    schemas = [item.split("=", 1) for item in settings.sqlite_attach.split(",") if item.strip()]
+
+    @event.listens_for(target, "connect")
+    def _attach(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for schema, path in schemas:
+            cursor.execute(f"ATTACH DATABASE '{path.strip()}' AS \"{schema.strip()}\"")
+        cursor.close()
+
+
+def _create_engine(url: str):
+    target = create_engine(
+        url,
+        future=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    attach_sqlite_schemas(target)
+    return target
+
+
+# Primary: the workplanner OLTP database. Only used directly for writes.
+engine = _create_engine(settings.database_url)
+
+# All reporting reads go here: the read replica if one is configured, else the primary
+reporting_engine = _create_engine(settings.database_replica_url) if settings.database_replica_url else engine
+
+
+class PoolMetrics:
+    """
+    How long callers wait to check a connection out of a pool. A steadily growing
+    wait means report concurrency is higher than the pool can serve.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "p95_wait_ms": recent[int(0.95 * (len(recent) - 1))] * 1000 if recent else 0.0,
+            }
+
+
+_metrics = {id(engine): PoolMetrics()}
+if reporting_engine is not engine:
+    _metrics[id(reporting_engine)] = PoolMetrics()
+
+
+@contextmanager
+def connect(target=None):
+    """
+    engine.connect() with checkout wait timing. Defaults to the reporting engine.
+    """
+    target = reporting_engine if target is None else target
+    metrics = _metrics[id(target)]
+    start = time.perf_counter()
+    try:
+        conn = target.connect()
+    except PoolTimeoutError:
+        metrics.record_timeout()
+        raise
+    metrics.record(time.perf_counter() - start)
+    with conn:
+        yield conn
+
+
+def _engine_stats(target) -> dict:
+    pool = target.pool
+    status = {"url": target.url.render_as_string(hide_password=True), "pool": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            status[name] = getattr(pool, name)()
+    status.update(_metrics[id(target)].stats())
+    return status
+
+
+def pool_stats() -> dict:
+    stats = {"primary": _engine_stats(engine)}
+    if reporting_engine is not engine:
+        stats["replica"] = _engine_stats(reporting_engine)
+    return stats
+
+
+def dispose_engines():
+    """
+    Drop pooled connections inherited from a parent process without closing them
+    (they still belong to the parent). Call first thing in a new worker process.
+    """
+    engine.dispose(close=False)
+    if reporting_engine is not engine:
+        reporting_engine.dispose(close=False)
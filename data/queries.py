@@ -1,33 +1,464 @@
-from sqlalchemy import create_engine, text
+import hashlib
+import io
+from typing import Optional
+
+from sqlalchemy import Date, bindparam, text
 import pandas as pd
 from config.settings import settings
+from data.database import connect
+from dto.report_dto import ReportDataDTO, ReportFilter
+
+PROJECT_EMPLOYEE_TOTAL_HOURS = "project_employee_total_hours"
+AVG_COMPLETED_PROJECT_DURATION = "avg_completed_project_duration"
+PROJECT_DURATION_VARIANCE = "project_duration_variance"
+MONTHLY_PROJECT_HOURS = "monthly_project_hours"
+
+REPORT_VIEWS = (
+    PROJECT_EMPLOYEE_TOTAL_HOURS,
+    AVG_COMPLETED_PROJECT_DURATION,
+    PROJECT_DURATION_VARIANCE,
+    MONTHLY_PROJECT_HOURS,
+)
+
+# Summary tables (see data.summary_tables): one per view, plus the source version
+# each manager's rows were last refreshed from
+SUMMARY_TABLE_PREFIX = "summary_"
+SUMMARY_STATE_TABLE = "summary_refresh_state"
+
+
+def view_source(name: str) -> str:
+    """
+    The relation a reporting view is read from: its summary table when
+    SUMMARY_TABLES_ENABLED, else the view itself.
+    """
+    return SUMMARY_TABLE_PREFIX + name if settings.summary_tables_enabled else name
+
+
+# Views with one row per project, which a ReportFilter's project list applies to
+PROJECT_VIEWS = (
+    PROJECT_EMPLOYEE_TOTAL_HOURS,
+    PROJECT_DURATION_VARIANCE,
+    MONTHLY_PROJECT_HOURS,
+)
+
+
+def filter_predicates(name: str, alias: str, report_filter: Optional[ReportFilter]):
+    """
+    The WHERE predicates (each starting with AND) that restrict a read of view
+    `name`, aliased or qualified as `alias`, to a ReportFilter, as
+    (sql, bindparams, params).
+
+    Dates filter monthly_project_hours on "month". The other project views have no
+    date column; they are limited to the projects with hours in the window, and
+    their figures stay lifetime totals (the report labels them so, as do the gRPC
+    and REST filter docs). avg_completed_project_duration is a single per-manager
+    figure and is never filtered.
+    """
+    if report_filter is None or name not in PROJECT_VIEWS:
+        return "", [], {}
+
+    sql, binds, params = "", [], {}
+    if report_filter.project_ids:
+        sql += f' AND {alias}."projectId" IN :project_ids'
+        binds.append(bindparam("project_ids", expanding=True))
+        params["project_ids"] = list(report_filter.project_ids)
+
+    if report_filter.has_dates:
+        window = ""
+        if report_filter.from_date:
+            window += " AND {0}.month >= :from_month"
+            binds.append(bindparam("from_month", type_=Date))
+            params["from_month"] = report_filter.from_month
+        if report_filter.to_date:
+            window += " AND {0}.month <= :to_date"
+            binds.append(bindparam("to_date", type_=Date))
+            params["to_date"] = report_filter.to_date
+
+        if name == MONTHLY_PROJECT_HOURS:
+            sql += window.format(alias)
+        else:
+            sql += (
+                f' AND {alias}."projectId" IN ('
+                f'SELECT w."projectId" FROM {view_source(MONTHLY_PROJECT_HOURS)} w '
+                f'WHERE w."managerId" = {alias}."managerId"{window.format("w")})'
+            )
+    return sql, binds, params
+
+FETCH_ENGINES = ("read_sql", "copy")
+
+if settings.fetch_engine not in FETCH_ENGINES:
+    raise ValueError(f"FETCH_ENGINE must be one of {FETCH_ENGINES}, got {settings.fetch_engine!r}")
+
+# Known column types of the reporting views, so the COPY engine never has to guess.
+# Columns not listed here are inferred.
+VIEW_DTYPES = {
+    "managerId": "int64",
+    "projectId": "int64",
+    "projectName": str,
+    "userName": str,
+    "totalHours": "float64",
+    "totalMonthlyHours": "float64",
+    "averageProjectDurationDays": "float64",
+}
+VIEW_DATE_COLUMNS = ("month",)
+
+
+# COPY output is parsed in pieces of about this many bytes of CSV text
+COPY_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class _CsvChunkReader:
+    """
+    File-like target for COPY ... TO STDOUT: parses the CSV into frames about every
+    COPY_CHUNK_BYTES as it arrives, so the whole text is never held at once.
+    Postgres sends one row per CopyData message and psycopg2 writes one message per
+    call, so every write ends on a row boundary, even with newlines in quoted values.
+    """
+    def __init__(self):
+        self.header = None
+        self.buffer = io.BytesIO()
+        self.frames = []
+
+    def write(self, data):
+        if self.header is None:
+            self.header = bytes(data)
+            return
+        self.buffer.write(data)
+        if self.buffer.tell() >= COPY_CHUNK_BYTES:
+            self._parse()
+
+    def _parse(self):
+        text = io.BytesIO(self.header + self.buffer.getvalue())
+        self.buffer = io.BytesIO()
+        # round_trip: the default fast float parser can be off in the last digit
+        self.frames.append(pd.read_csv(
+            text, dtype=VIEW_DTYPES, keep_default_na=False, na_values=[""], float_precision="round_trip",
+        ))
+
+    def frame(self) -> pd.DataFrame:
+        if self.buffer.tell() or not self.frames:
+            self._parse()
+        if len(self.frames) == 1:
+            return self.frames[0]
+        return pd.concat(self.frames, ignore_index=True)
+
+
+def _copy_frame(query, conn, params=None) -> pd.DataFrame:
+    """
+    Postgres only: runs the query as COPY ... TO STDOUT (CSV) and parses the text
+    with pandas' C parser into typed columns as it streams in, instead of building
+    a Python tuple per row through the DBAPI cursor like read_sql does.
+
+    The frames match read_sql's except for NUMERIC columns: psycopg2 returns those
+    as Decimal, the CSV parse as float64. Views with NUMERIC columns therefore get
+    different report cache keys per engine, so switching FETCH_ENGINE starts their
+    cached reports over.
+    """
+    if params:
+        query = query.bindparams(**params)
+    compiled = query.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    raw = conn.connection.driver_connection
+    reader = _CsvChunkReader()
+    with raw.cursor() as cur:
+        sql = cur.mogrify(str(compiled), compiled.params).decode("utf-8")
+        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", reader)
+    df = reader.frame()
+    for col in VIEW_DATE_COLUMNS:
+        if col not in df.columns:
+            continue
+        # An empty or all-NULL column comes back from read_csv as float, not text
+        values = df[col].dropna()
+        if values.empty or not pd.api.types.is_string_dtype(values):
+            continue
+        is_date = values.str.len().max() <= len("YYYY-MM-DD")
+        df[col] = pd.to_datetime(df[col])
+        if is_date:
+            # read_sql hands back datetime.date for DATE columns; keep the frames alike
+            df[col] = df[col].dt.date
+    return df
+
+
+def read_view_frame(query, conn, params=None) -> pd.DataFrame:
+    """
+    Reads a reporting view query with the configured FETCH_ENGINE. "copy" needs
+    psycopg2; on any other database it falls back to read_sql.
+    """
+    if settings.fetch_engine == "copy" and conn.dialect.driver == "psycopg2":
+        return _copy_frame(query, conn, params)
+    return pd.read_sql(query, conn, params=params)
 
-engine = create_engine(settings.database_url, future=True)
 
 def fetch_view(name: str) -> pd.DataFrame:
-    query = text(f"SELECT * FROM {name}")
-    with engine.connect() as conn:
-        return pd.read_sql(query, conn)
+    query = text(f"SELECT * FROM {view_source(name)}")
+    with connect() as conn:
+        return read_view_frame(query, conn)
+
 
+def view_by_manager_query(name: str, manager_id: int, report_filter: Optional[ReportFilter] = None):
+    """
+    One manager's rows of a view, restricted to `report_filter`, as (query, params).
+    """
+    source = view_source(name)
+    where, binds, params = filter_predicates(name, f'"{source}"', report_filter)
+    query = text(f'SELECT * FROM {source} WHERE "{source}"."managerId" = :mid{where}').bindparams(*binds)
+    return query, {"mid": manager_id, **params}
 
-def fetch_view_by_manager(name: str, manager_id: int) -> pd.DataFrame:
-    query = text(f'SELECT * FROM {name} WHERE "{name}"."managerId" = :mid')
-    with engine.connect() as conn:
-        return pd.read_sql(query, conn, params={"mid": manager_id})
+
+def fetch_view_by_manager(name: str, manager_id: int, report_filter: Optional[ReportFilter] = None) -> pd.DataFrame:
+    query, params = view_by_manager_query(name, manager_id, report_filter)
+    with connect() as conn:
+        return read_view_frame(query, conn, params=params)
 
 def fetch_manager(manager_id: int):
     query = text(f'SELECT name FROM "workplanner"."User" WHERE id = :mid')
-    with engine.connect() as conn:
+    with connect() as conn:
         df = pd.read_sql(query, conn, params={"mid": manager_id})
     if not df.empty:
         return str(df.iloc[0, 0])
     return None
 
+def fetch_view_for_managers(name: str, manager_ids: list[int], conn=None,
+                            report_filter: Optional[ReportFilter] = None) -> pd.DataFrame:
+    """
+    Fetch a view once for every requested manager instead of once per manager.
+    """
+    source = view_source(name)
+    where, binds, filter_params = filter_predicates(name, f'"{source}"', report_filter)
+    query = text(
+        f'SELECT * FROM {source} WHERE "{source}"."managerId" IN :mids{where}'
+    ).bindparams(bindparam("mids", expanding=True), *binds)
+    params = {"mids": list(manager_ids), **filter_params}
+    if conn is not None:
+        return read_view_frame(query, conn, params=params)
+    with connect() as conn:
+        return read_view_frame(query, conn, params=params)
+
+
+def fetch_manager_names(manager_ids: list[int], conn=None) -> dict[int, str]:
+    query = text(
+        'SELECT id, name FROM "workplanner"."User" WHERE id IN :mids'
+    ).bindparams(bindparam("mids", expanding=True))
+    params = {"mids": list(manager_ids)}
+    if conn is not None:
+        df = pd.read_sql(query, conn, params=params)
+    else:
+        with connect() as conn:
+            df = pd.read_sql(query, conn, params=params)
+    return {int(row.id): str(row.name) for row in df.itertuples(index=False)}
+
+
+def monthly_totals_query(manager_ids: list[int], report_filter: Optional[ReportFilter] = None):
+    """
+    Chart-ready monthly hours: one row per manager and month, summed over projects
+    in SQL, for each manager's latest CHART_MAX_MONTHS months.
+    """
+    where, binds, filter_params = filter_predicates(MONTHLY_PROJECT_HOURS, "m", report_filter)
+    query = text(f'''
+        SELECT "managerId", month, "totalMonthlyHours"
+        FROM (
+            SELECT "managerId", month, SUM("totalMonthlyHours") AS "totalMonthlyHours",
+                   ROW_NUMBER() OVER (PARTITION BY "managerId" ORDER BY month DESC) AS "monthRank"
+            FROM {view_source(MONTHLY_PROJECT_HOURS)} m
+            WHERE "managerId" IN :mids{where}
+            GROUP BY "managerId", month
+        ) totals
+        WHERE "monthRank" <= :max_months
+        ORDER BY "managerId", month
+    ''').bindparams(bindparam("mids", expanding=True), *binds)
+    return query, {"mids": list(manager_ids), "max_months": settings.chart_max_months, **filter_params}
+
+
+def employee_hours_query(manager_ids: list[int], report_filter: Optional[ReportFilter] = None):
+    """
+    Project x employee hours for each manager's CHART_TOP_PROJECTS projects with the
+    most hours, ranked in SQL.
+    """
+    where, binds, filter_params = filter_predicates(PROJECT_EMPLOYEE_TOTAL_HOURS, "h", report_filter)
+    query = text(f'''
+        SELECT "managerId", "projectName", "userName", "totalHours"
+        FROM (
+            SELECT "managerId", "projectName", "userName", "totalHours",
+                   DENSE_RANK() OVER (
+                       PARTITION BY "managerId" ORDER BY "projectTotal" DESC, "projectId"
+                   ) AS "projectRank"
+            FROM (
+                SELECT h.*, SUM("totalHours") OVER (PARTITION BY "managerId", "projectId") AS "projectTotal"
+                FROM {view_source(PROJECT_EMPLOYEE_TOTAL_HOURS)} h
+                WHERE h."managerId" IN :mids{where}
+            ) hours
+        ) ranked
+        WHERE "projectRank" <= :top_projects
+    ''').bindparams(bindparam("mids", expanding=True), *binds)
+    return query, {"mids": list(manager_ids), "top_projects": settings.chart_top_projects, **filter_params}
+
+
+def fetch_chart_aggregates_for_managers(manager_ids: list[int], conn=None,
+                                        report_filter: Optional[ReportFilter] = None) -> tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """
+    The pre-aggregated chart inputs for many managers: the latest N monthly totals
+    (None unless CHART_MAX_MONTHS is set) and the top-N project x employee hours
+    (None unless CHART_TOP_PROJECTS is set). Without a limit the charts use the
+    full views they already have, so the extra round trip is skipped.
+    """
+    if conn is None:
+        with connect() as conn:
+            return fetch_chart_aggregates_for_managers(manager_ids, conn, report_filter)
+
+    monthly_totals = None
+    if settings.chart_max_months > 0:
+        query, params = monthly_totals_query(manager_ids, report_filter)
+        monthly_totals = read_view_frame(query, conn, params)
+    employee_hours = None
+    if settings.chart_top_projects > 0:
+        query, params = employee_hours_query(manager_ids, report_filter)
+        employee_hours = read_view_frame(query, conn, params)
+    return monthly_totals, employee_hours
+
+
+def partition_by_manager(df: pd.DataFrame, manager_ids: list[int]) -> dict[int, pd.DataFrame]:
+    """
+    Split a multi-manager frame into one frame per manager.
+    Managers without rows get an empty frame with the same columns.
+    """
+    groups = {
+        int(mid): group.reset_index(drop=True)
+        for mid, group in df.groupby("managerId", sort=False)
+    }
+    empty = df.iloc[0:0]
+    return {mid: groups.get(mid, empty) for mid in manager_ids}
+
+
+def fetch_report_data(manager_id: int, report_filter: Optional[ReportFilter] = None) -> ReportDataDTO:
+    monthly_totals, employee_hours = fetch_chart_aggregates_for_managers([manager_id], report_filter=report_filter)
+    return ReportDataDTO(
+        manager_id=manager_id,
+        manager_name=fetch_manager(manager_id),
+        project_hours=fetch_view_by_manager(PROJECT_EMPLOYEE_TOTAL_HOURS, manager_id, report_filter),
+        avg_duration=fetch_view_by_manager(AVG_COMPLETED_PROJECT_DURATION, manager_id, report_filter),
+        variance=fetch_view_by_manager(PROJECT_DURATION_VARIANCE, manager_id, report_filter),
+        monthly=fetch_view_by_manager(MONTHLY_PROJECT_HOURS, manager_id, report_filter),
+        monthly_totals=monthly_totals,
+        employee_hours=employee_hours,
+        report_filter=report_filter,
+    )
+
+
+def fetch_report_data_for_managers(manager_ids: list[int],
+                                   report_filter: Optional[ReportFilter] = None) -> dict[int, ReportDataDTO]:
+    """
+    Bulk variant of fetch_report_data: one query per view plus one for the
+    manager names, regardless of how many managers are requested.
+    """
+    manager_ids = [int(mid) for mid in manager_ids]
+    if not manager_ids:
+        return {}
+
+    with connect() as conn:
+        names = fetch_manager_names(manager_ids, conn)
+        frames = {
+            name: partition_by_manager(fetch_view_for_managers(name, manager_ids, conn, report_filter), manager_ids)
+            for name in REPORT_VIEWS
+        }
+        monthly_totals, employee_hours = fetch_chart_aggregates_for_managers(manager_ids, conn, report_filter)
+        if monthly_totals is not None:
+            monthly_totals = partition_by_manager(monthly_totals, manager_ids)
+        if employee_hours is not None:
+            employee_hours = partition_by_manager(employee_hours, manager_ids)
+
+    return {
+        mid: ReportDataDTO(
+            manager_id=mid,
+            manager_name=names.get(mid),
+            project_hours=frames[PROJECT_EMPLOYEE_TOTAL_HOURS][mid],
+            avg_duration=frames[AVG_COMPLETED_PROJECT_DURATION][mid],
+            variance=frames[PROJECT_DURATION_VARIANCE][mid],
+            monthly=frames[MONTHLY_PROJECT_HOURS][mid],
+            monthly_totals=monthly_totals[mid] if monthly_totals is not None else None,
+            employee_hours=employee_hours[mid] if employee_hours is not None else None,
+            report_filter=report_filter,
+        )
+        for mid in manager_ids
+    }
+
+def manager_versions_query(manager_ids: Optional[list[int]] = None, live: bool = False):
+    """
+    The change-detection query behind fetch_manager_versions, as (query, params).
+
+    With summary tables enabled, reports are built from what the tables hold, so
+    the version is the one recorded at the manager's last refresh; `live` forces
+    the probe of the workplanner source tables (which the refresh itself uses).
+    """
+    if settings.summary_tables_enabled and not live:
+        where = 'WHERE "managerId" IN :mids' if manager_ids is not None else ""
+        query = text(f'SELECT "managerId", version FROM {SUMMARY_STATE_TABLE} {where}')
+        params = {}
+        if manager_ids is not None:
+            query = query.bindparams(bindparam("mids", expanding=True))
+            params = {"mids": [int(mid) for mid in manager_ids]}
+        return query, params
+
+    time_entries = f'"workplanner"."{settings.time_entry_table}"'
+    where = 'WHERE p."ownerId" IN :mids' if manager_ids is not None else ""
+    query = text(f'''
+        SELECT p."ownerId" AS "managerId",
+               COUNT(DISTINCT p.id) AS "projectCount",
+               MAX(p."updatedAt") AS "projectUpdatedAt",
+               COUNT(t.id) AS "entryCount",
+               MAX(t."updatedAt") AS "entryUpdatedAt",
+               MAX(o."updatedAt") AS "ownerUpdatedAt",
+               MAX(u."updatedAt") AS "userUpdatedAt"
+        FROM "workplanner"."Project" p
+        LEFT JOIN {time_entries} t ON t."projectId" = p.id
+        LEFT JOIN "workplanner"."User" o ON o.id = p."ownerId"
+        LEFT JOIN "workplanner"."User" u ON u.id = t."userId"
+        {where}
+        GROUP BY p."ownerId"
+    ''')
+    params = {}
+    if manager_ids is not None:
+        query = query.bindparams(bindparam("mids", expanding=True))
+        params = {"mids": [int(mid) for mid in manager_ids]}
+    return query, params
+
+
+def version_tokens(rows) -> dict[int, str]:
+    return {
+        int(row[0]): hashlib.sha1("|".join(str(v) for v in row).encode()).hexdigest()
+        for row in rows
+    }
+
+
+def fetch_manager_versions(manager_ids: Optional[list[int]] = None) -> dict[int, str]:
+    """
+    Cheap change detection: one aggregate query over the workplanner source tables
+    (row counts and latest "updatedAt" of the projects, their time entries and the
+    users involved) instead of scanning the four report views. The returned token
+    changes whenever anything a manager's report is built from changes.
+
+    Returns {} if the probe fails, so callers fall back to fetching the views.
+    """
+    if manager_ids is not None and not manager_ids:
+        return {}
+    query, params = manager_versions_query(manager_ids)
+
+    try:
+        with connect() as conn:
+            rows = conn.execute(query, params).all()
+    except Exception as e:
+        print(f"Database error probing manager versions: {e}")
+        return {}
+
+    return version_tokens(rows)
+
+
+def fetch_manager_version(manager_id: int) -> Optional[str]:
+    return fetch_manager_versions([manager_id]).get(int(manager_id))
+
 def fetch_all_manager_ids() -> list[int]:
     query = text('SELECT DISTINCT "ownerId" FROM "workplanner"."Project"')
 
     try:
-        with engine.connect() as conn:
+        with connect() as conn:
             df = pd.read_sql(query, conn)
 
         if df.empty:
@@ -40,31 +471,31 @@ def fetch_all_manager_ids() -> list[int]:
         return []
 
 def get_project_employee_total_hours():
-    return fetch_view("project_employee_total_hours")
+    return fetch_view(PROJECT_EMPLOYEE_TOTAL_HOURS)
 
 
 def get_avg_completed_project_duration():
-    return fetch_view("avg_completed_project_duration")
+    return fetch_view(AVG_COMPLETED_PROJECT_DURATION)
 
 
 def get_project_duration_variance():
-    return fetch_view("project_duration_variance")
+    return fetch_view(PROJECT_DURATION_VARIANCE)
 
 
 def get_monthly_project_hours():
-    return fetch_view("monthly_project_hours")
+    return fetch_view(MONTHLY_PROJECT_HOURS)
 
 def get_project_employee_total_hours_by_manager(manager_id):
-    return fetch_view_by_manager("project_employee_total_hours", manager_id)
+    return fetch_view_by_manager(PROJECT_EMPLOYEE_TOTAL_HOURS, manager_id)
 
 
 def get_avg_completed_project_duration_hours_by_manager(manager_id):
-    return fetch_view_by_manager("avg_completed_project_duration", manager_id)
+    return fetch_view_by_manager(AVG_COMPLETED_PROJECT_DURATION, manager_id)
 
 
 def get_project_duration_variance_hours_by_manager(manager_id):
-    return fetch_view_by_manager("project_duration_variance", manager_id)
+    return fetch_view_by_manager(PROJECT_DURATION_VARIANCE, manager_id)
 
 
 def get_monthly_project_hours_hours_by_manager(manager_id):
-    return fetch_view_by_manager("monthly_project_hours", manager_id)
+    return fetch_view_by_manager(MONTHLY_PROJECT_HOURS, manager_id)
@@ -0,0 +1,162 @@
+"""
+Summary tables for the four reporting views, so a report read is an index lookup on
+"managerId" instead of an aggregation over the workplanner tables.
+
+    python -m data.summary_tables refresh          # only managers whose source rows changed
+    python -m data.summary_tables refresh --full   # drop, recreate and fill everything
+    python -m data.summary_tables status
+
+Each summary_<view> table has the view's columns and an index on "managerId".
+summary_refresh_state records, per manager, the source version token (see
+data.queries.manager_versions_query) the rows were computed from; a refresh
+recomputes exactly the managers whose live token differs. Writes go to the
+primary database. Reads only use the tables when SUMMARY_TABLES_ENABLED is set.
+"""
+import argparse
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, inspect, text
+
+from config.settings import settings
+from data.database import connect, engine
+from data.queries import (
+    REPORT_VIEWS,
+    SUMMARY_STATE_TABLE,
+    SUMMARY_TABLE_PREFIX,
+    manager_versions_query,
+    version_tokens,
+)
+
+
+def summary_table(view: str) -> str:
+    return SUMMARY_TABLE_PREFIX + view
+
+
+def create_summary_tables(conn, drop: bool = False):
+    """
+    Create any missing summary tables (empty, with the views' columns) and their indexes.
+    """
+    if drop:
+        for view in REPORT_VIEWS:
+            conn.execute(text(f"DROP TABLE IF EXISTS {summary_table(view)}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {SUMMARY_STATE_TABLE}"))
+
+    existing = set(inspect(conn).get_table_names())
+    for view in REPORT_VIEWS:
+        table = summary_table(view)
+        if table not in existing:
+            conn.execute(text(f"CREATE TABLE {table} AS SELECT * FROM {view} WHERE 1 = 0"))
+            conn.execute(text(f'CREATE INDEX ix_{table}_manager ON {table} ("managerId")'))
+    if SUMMARY_STATE_TABLE not in existing:
+        conn.execute(text(
+            f'CREATE TABLE {SUMMARY_STATE_TABLE} ('
+            f'"managerId" INTEGER PRIMARY KEY, version TEXT NOT NULL, "refreshedAt" TEXT NOT NULL)'
+        ))
+
+
+def _stored_versions(conn) -> dict[int, str]:
+    rows = conn.execute(text(f'SELECT "managerId", version FROM {SUMMARY_STATE_TABLE}')).all()
+    return {int(row[0]): row[1] for row in rows}
+
+
+def _refresh_managers(conn, manager_ids: list[int], versions: dict[int, str]):
+    """
+    Replace the summary rows of these managers with freshly computed ones, and record
+    the versions they were computed from. Runs inside the caller's transaction.
+    """
+    mids = bindparam("mids", expanding=True)
+    params = {"mids": manager_ids}
+    for view in REPORT_VIEWS:
+        table = summary_table(view)
+        conn.execute(text(f'DELETE FROM {table} WHERE "managerId" IN :mids').bindparams(mids), params)
+        conn.execute(
+            text(f'INSERT INTO {table} SELECT * FROM {view} WHERE "{view}"."managerId" IN :mids').bindparams(mids),
+            params,
+        )
+
+    conn.execute(text(f'DELETE FROM {SUMMARY_STATE_TABLE} WHERE "managerId" IN :mids').bindparams(mids), params)
+    refreshed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    live = [mid for mid in manager_ids if mid in versions]
+    if live:
+        conn.execute(
+            text(f'INSERT INTO {SUMMARY_STATE_TABLE} ("managerId", version, "refreshedAt") VALUES (:mid, :version, :at)'),
+            [{"mid": mid, "version": versions[mid], "at": refreshed_at} for mid in live],
+        )
+
+
+def refresh_summary_tables(full: bool = False) -> dict:
+    """
+    Bring the summary tables up to date with the workplanner data. Only managers whose
+    live version token changed (or who appeared or disappeared) are recomputed, in
+    transactions of SUMMARY_REFRESH_BATCH managers. Returns counts for logging.
+    """
+    with connect(engine) as conn:
+        with conn.begin():
+            create_summary_tables(conn, drop=full)
+            query, params = manager_versions_query(live=True)
+            versions = version_tokens(conn.execute(query, params).all())
+            stored = _stored_versions(conn)
+
+    stale = sorted(mid for mid, version in versions.items() if stored.get(mid) != version)
+    removed = sorted(set(stored) - set(versions))
+    todo = stale + removed
+    batch = max(1, settings.summary_refresh_batch)
+
+    for i in range(0, len(todo), batch):
+        with connect(engine) as conn:
+            with conn.begin():
+                _refresh_managers(conn, todo[i:i + batch], versions)
+
+    return {
+        "managers": len(versions),
+        "refreshed": len(stale),
+        "removed": len(removed),
+        "unchanged": len(versions) - len(stale),
+    }
+
+
+def summary_status() -> dict:
+    with connect(engine) as conn:
+        existing = set(inspect(conn).get_table_names())
+        if SUMMARY_STATE_TABLE not in existing:
+            return {"created": False, "enabled": settings.summary_tables_enabled}
+        stored = _stored_versions(conn)
+        last = conn.execute(text(f'SELECT MAX("refreshedAt") FROM {SUMMARY_STATE_TABLE}')).scalar()
+        query, params = manager_versions_query(live=True)
+        versions = version_tokens(conn.execute(query, params).all())
+        rows = {
+            view: conn.execute(text(f"SELECT COUNT(*) FROM {summary_table(view)}")).scalar()
+            for view in REPORT_VIEWS
+        }
+    return {
+        "created": True,
+        "enabled": settings.summary_tables_enabled,
+        "managers": len(stored),
+        "stale": sum(1 for mid, version in versions.items() if stored.get(mid) != version)
+                 + len(set(stored) - set(versions)),
+        "last_refreshed_at": last,
+        "rows": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    refresh = commands.add_parser("refresh", help="recompute managers whose source rows changed")
+    refresh.add_argument("--full", action="store_true", help="drop and rebuild every summary table")
+    commands.add_parser("status", help="show row counts and how many managers are stale")
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        result = refresh_summary_tables(full=args.full)
+        print(
+            f"Summary tables refreshed: {result['refreshed']} managers recomputed, "
+            f"{result['removed']} removed, {result['unchanged']} unchanged"
+        )
+    else:
+        for key, value in summary_status().items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
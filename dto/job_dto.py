@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class JobDTO:
+    id: str
+    kind: str  # "manager" or "all"
+    manager_id: Optional[int]
+    status: str  # "queued", "running", "succeeded" or "failed"
+    total: int
+    completed: int
+    failed: int
+    error: Optional[str]
+    result_path: Optional[str]
+    created_at: str
+    started_at: Optional[str]
+    finished_at: Optional[str]
@@ -1,5 +1,78 @@
+import base64
 from dataclasses import dataclass
-from typing import Dict, Optional
+from datetime import date
+from functools import cached_property
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+
+@dataclass
+class ChartDTO:
+    """
+    One rendered chart: raw image bytes plus how to label them.
+    """
+    data: bytes
+    media_type: str  # "image/png" or "image/svg+xml"
+    extension: str  # "png" or "svg"
+
+    @cached_property
+    def base64(self) -> str:
+        # Encoded at most once per chart, then shared by the HTML and the gRPC message
+        return base64.b64encode(self.data).decode("utf-8")
+
+
+@dataclass(frozen=True)
+class ReportFilter:
+    """
+    Optional window a report is restricted to. Both dates are inclusive; a month is
+    in the window when any of its days is. An empty `project_ids` means all projects.
+    """
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    project_ids: Tuple[int, ...] = ()
+
+    @classmethod
+    def parse(cls, from_date: Optional[str] = None, to_date: Optional[str] = None,
+              project_ids: Optional[Iterable[int]] = None) -> Optional["ReportFilter"]:
+        """
+        Builds a filter from request values (ISO dates, empty meaning unset).
+        Returns None when nothing is set, so unfiltered reports stay on the plain path.
+        Raises ValueError for malformed dates or an empty window.
+        """
+        start = date.fromisoformat(from_date) if from_date else None
+        end = date.fromisoformat(to_date) if to_date else None
+        if start and end and start > end:
+            raise ValueError(f"from date {start} is after to date {end}")
+        ids = tuple(sorted({int(pid) for pid in project_ids or ()}))
+        if start is None and end is None and not ids:
+            return None
+        return cls(from_date=start, to_date=end, project_ids=ids)
+
+    @property
+    def has_dates(self) -> bool:
+        return self.from_date is not None or self.to_date is not None
+
+    @property
+    def from_month(self) -> Optional[date]:
+        # "month" columns hold the first day of the month
+        return self.from_date.replace(day=1) if self.from_date else None
+
+    @property
+    def token(self) -> str:
+        """Stable text form, for cache keys and ETags."""
+        ids = ",".join(str(pid) for pid in self.project_ids)
+        return f"{self.from_date or ''}..{self.to_date or ''}:{ids}"
+
+    @property
+    def label(self) -> str:
+        """Human-readable description for the report header."""
+        parts = []
+        if self.has_dates:
+            parts.append(f"{self.from_date or 'start'} to {self.to_date or 'today'}")
+        if self.project_ids:
+            parts.append(f"projects {', '.join(str(pid) for pid in self.project_ids)}")
+        return "; ".join(parts)
 
 
 @dataclass
@@ -7,6 +80,30 @@ class ReportDTO:
     manager_id: int
     manager_name: str
     html: str
-    pdf_path: Optional[str]
-    charts: Dict[str, str]
-    file_name: str
\ No newline at end of file
+    pdf: Optional[bytes]
+    charts: Dict[str, ChartDTO]
+    file_name: Optional[str]  # download name for the PDF
+    error: Optional[str] = None  # why the report could not be generated; everything else is empty then
+
+    @classmethod
+    def failed(cls, manager_id: int, error: str) -> "ReportDTO":
+        """Placeholder for a manager whose report failed, so batch callers can report it."""
+        return cls(manager_id=manager_id, manager_name=None, html="", pdf=None, charts={}, file_name=None, error=error)
+
+
+@dataclass
+class ReportDataDTO:
+    """
+    The four reporting view frames (and the manager's name) a report is built from,
+    plus the chart inputs pre-aggregated in SQL. Charts fall back to the view frames
+    when an aggregate is None.
+    """
+    manager_id: int
+    manager_name: Optional[str]
+    project_hours: pd.DataFrame
+    avg_duration: pd.DataFrame
+    variance: pd.DataFrame
+    monthly: pd.DataFrame
+    monthly_totals: Optional[pd.DataFrame] = None  # latest months only; see CHART_MAX_MONTHS
+    employee_hours: Optional[pd.DataFrame] = None  # top-N projects only; see CHART_TOP_PROJECTS
+    report_filter: Optional[ReportFilter] = None  # window the frames were fetched for
@@ -0,0 +1,115 @@
+import logging
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from config.settings import settings
+from data.queries import fetch_all_manager_ids
+from dto.job_dto import JobDTO
+from jobs.job_store import JOB_ALL, JOB_MANAGER, STATUS_RUNNING, JobStore
+from reports.report_generator import OUTPUT_PDF, generate_manager_report
+from reports.zip_export import iter_manager_reports_zip
+
+logger = logging.getLogger(__name__)
+
+_store: Optional[JobStore] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    global _store
+    with _lock:
+        if _store is None:
+            _store = JobStore(settings.jobs_db_path)
+        return _store
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.job_workers, thread_name_prefix="report-job")
+        return _executor
+
+
+def _job_dir(job_id: str) -> Path:
+    path = Path(settings.jobs_dir) / job_id
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _run_manager_job(store: JobStore, job: JobDTO) -> str:
+    store.mark_running(job.id, total=1)
+    report = generate_manager_report(job.manager_id, outputs={OUTPUT_PDF})
+    result_path = _job_dir(job.id) / f"manager_{job.manager_id}.pdf"
+    result_path.write_bytes(report.pdf)
+    store.update_progress(job.id, completed=1, failed=0)
+    return str(result_path)
+
+
+def _run_all_managers_job(store: JobStore, job: JobDTO) -> str:
+    manager_ids = fetch_all_manager_ids()
+    store.mark_running(job.id, total=len(manager_ids))
+
+    result_path = _job_dir(job.id) / "manager_reports.zip"
+    completed = failed = 0
+
+    def _progress(report):
+        nonlocal completed, failed
+        if report.error:
+            failed += 1
+        else:
+            completed += 1
+        store.update_progress(job.id, completed=completed, failed=failed)
+
+    # Failed managers are counted and get an error entry in the archive
+    with open(result_path, "wb") as fh:
+        for data in iter_manager_reports_zip(manager_ids, on_report=_progress):
+            fh.write(data)
+    return str(result_path)
+
+
+def _run_job(job_id: str):
+    store = get_job_store()
+    job = store.get(job_id)
+    if job is None:
+        return
+    try:
+        if job.kind == JOB_MANAGER:
+            result_path = _run_manager_job(store, job)
+        else:
+            result_path = _run_all_managers_job(store, job)
+        store.mark_succeeded(job.id, result_path)
+        logger.info("Report job %s finished: %s", job.id, result_path)
+    except Exception as e:
+        logger.exception("Report job %s failed", job.id)
+        store.mark_failed(job.id, str(e))
+
+
+def submit_job(manager_id: Optional[int] = None) -> JobDTO:
+    """
+    Queue a report job for one manager, or for every project owner if manager_id is None.
+    """
+    store = get_job_store()
+    purge_expired_jobs()
+    job = store.create(JOB_MANAGER if manager_id is not None else JOB_ALL, manager_id)
+    _get_executor().submit(_run_job, job.id)
+    return job
+
+
+def resume_unfinished_jobs():
+    """
+    Re-queue jobs that were queued or running when the process last stopped.
+    """
+    for job in get_job_store().list_unfinished():
+        if job.status == STATUS_RUNNING:
+            logger.info("Restarting interrupted report job %s", job.id)
+        _get_executor().submit(_run_job, job.id)
+
+
+def purge_expired_jobs():
+    for job in get_job_store().delete_finished_before(settings.job_retention_hours):
+        shutil.rmtree(Path(settings.jobs_dir) / job.id, ignore_errors=True)
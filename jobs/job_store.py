@@ -0,0 +1,130 @@
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from dto.job_dto import JobDTO
+
+JOB_MANAGER = "manager"
+JOB_ALL = "all"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+_COLUMNS = (
+    "id, kind, manager_id, status, total, completed, failed, error, "
+    "result_path, created_at, started_at, finished_at"
+)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class JobStore:
+    """
+    Report job state in a local SQLite file, so jobs survive restarts.
+    A short-lived connection is opened per operation; callers may be on any thread.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS report_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    manager_id INTEGER,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result_path TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:  # commits, or rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, kind: str, manager_id: Optional[int] = None) -> JobDTO:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO report_jobs (id, kind, manager_id, status, total, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, manager_id, STATUS_QUEUED, 1 if kind == JOB_MANAGER else 0, _now()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[JobDTO]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+        return JobDTO(*row) if row else None
+
+    def list_unfinished(self) -> list[JobDTO]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM report_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchall()
+        return [JobDTO(*row) for row in rows]
+
+    def mark_running(self, job_id: str, total: int):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE report_jobs SET status = ?, total = ?, completed = 0, failed = 0, "
+                "error = NULL, started_at = ? WHERE id = ?",
+                (STATUS_RUNNING, total, _now(), job_id),
+            )
+
+    def update_progress(self, job_id: str, completed: int, failed: int):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE report_jobs SET completed = ?, failed = ? WHERE id = ?",
+                (completed, failed, job_id),
+            )
+
+    def mark_succeeded(self, job_id: str, result_path: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE report_jobs SET status = ?, result_path = ?, finished_at = ? WHERE id = ?",
+                (STATUS_SUCCEEDED, result_path, _now(), job_id),
+            )
+
+    def mark_failed(self, job_id: str, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE report_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (STATUS_FAILED, error, _now(), job_id),
+            )
+
+    def delete_finished_before(self, hours: float) -> list[JobDTO]:
+        """
+        Removes finished jobs older than `hours` and returns them so their files can be deleted.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat(timespec="seconds")
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM report_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (STATUS_SUCCEEDED, STATUS_FAILED, cutoff),
+            ).fetchall()
+            conn.executemany("DELETE FROM report_jobs WHERE id = ?", [(row[0],) for row in rows])
+        return [JobDTO(*row) for row in rows]
@@ -25,6 +25,9 @@ else:
     print(f"✅ Running on {platform.system()}, GTK libraries expected from system packages")
 
 from server.rest_router import router
+from jobs.job_runner import resume_unfinished_jobs
+from data.async_queries import dispose_async_engine
+from telemetry.metrics import RequestTimingMiddleware
 
 import uvicorn
 from fastapi import FastAPI
@@ -40,8 +43,22 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers, including Authorization
 )
 
+# Latency histogram and one timing log line per request, until the last body chunk is sent
+app.add_middleware(RequestTimingMiddleware)
+
 app.include_router(router)
 
+
+@app.on_event("startup")
+def resume_report_jobs():
+    # Pick up jobs that were queued or running when the server last stopped
+    resume_unfinished_jobs()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
 if __name__ == "__main__":
     # Use import string for reload to work, or disable reload in production
     uvicorn.run("main:app", host=settings.grpc_host, port=settings.grpc_port, reload=False)
\ No newline at end of file
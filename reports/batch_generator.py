@@ -0,0 +1,291 @@
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional
+
+from config.settings import settings
+from data.queries import fetch_all_manager_ids, fetch_manager_versions, fetch_report_data_for_managers
+from dto.report_dto import ReportDTO
+from reports.report_generator import ALL_OUTPUTS, cached_report_for_version, generate_manager_report
+
+logger = logging.getLogger(__name__)
+
+# How often iter_manager_reports checks whether its queued chunks have started
+_START_POLL_SECONDS = 0.5
+
+_pool: Optional["_WorkerPool"] = None
+_pool_lock = threading.Lock()
+_chunk_tokens = itertools.count()
+
+# Set in each worker process by _init_worker
+_started_queue = None
+
+
+def _init_worker(started_queue=None):
+    """
+    Runs once per worker process. Gives the worker its own connection pool and
+    warms the chart templates and WeasyPrint so the first report isn't paying for setup.
+    """
+    global _started_queue
+    _started_queue = started_queue
+
+    from data.database import dispose_engines
+    # Never reuse sockets inherited from the parent process
+    dispose_engines()
+
+    # Tasks run on the worker's main thread, which is also where the initializer runs
+    from reports.diagram_generator import warm_up as warm_up_charts
+    warm_up_charts()
+
+    from reports.pdf_generator import warm_up
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("WeasyPrint warm-up failed in worker")
+
+
+def _chunk_started(token: Optional[int]):
+    # Tells the submitting process that a worker picked the chunk up, which starts its timeout
+    if token is not None and _started_queue is not None:
+        _started_queue.put(token)
+
+
+def _render_chunk(manager_ids: list[int], outputs, token: Optional[int] = None) -> list[ReportDTO]:
+    """
+    Worker task: probe the chunk's data versions, serve unchanged managers from the
+    report cache, then bulk-fetch and render the rest. A manager whose report
+    fails comes back as ReportDTO.failed instead of being left out.
+    """
+    _chunk_started(token)
+    versions = fetch_manager_versions(manager_ids)
+    results = []
+    stale = []
+    for manager_id in manager_ids:
+        cached = cached_report_for_version(manager_id, versions.get(manager_id), outputs)
+        if cached is not None:
+            results.append(cached)
+        else:
+            stale.append(manager_id)
+
+    report_data = fetch_report_data_for_managers(stale)
+    for manager_id in stale:
+        try:
+            results.append(generate_manager_report(
+                manager_id,
+                data=report_data[manager_id],
+                version=versions.get(manager_id),
+                outputs=outputs,
+            ))
+        except Exception as e:
+            logger.exception("Failed to generate report for manager %s", manager_id)
+            results.append(ReportDTO.failed(manager_id, f"{type(e).__name__}: {e}"))
+    return results
+
+
+class _WorkerPool:
+    """
+    One generation of the shared report worker pool. Every iter_manager_reports call
+    holds the pool it has chunks on. A pool with a timed-out or crashed chunk is
+    retired: it gets no new chunks, and its workers are only stopped once the last
+    call holding it lets go, so a stuck worker is never killed under another
+    call's running chunk.
+    """
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self.started_queue = context.SimpleQueue()
+        # spawn, not fork: the gRPC server and SQLAlchemy pool must not be forked
+        self.executor = ProcessPoolExecutor(
+            max_workers=settings.report_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.started_queue,),
+        )
+        self.users = 0
+        self.retired = False
+        self._started: dict[int, float] = {}
+        self._started_lock = threading.Lock()
+
+    def started_at(self, token: int) -> Optional[float]:
+        """
+        When a worker picked up the chunk submitted with `token`, or None while it is
+        still queued (possibly behind other calls' chunks).
+        """
+        with self._started_lock:
+            while not self.started_queue.empty():
+                self._started[self.started_queue.get()] = time.monotonic()
+            return self._started.get(token)
+
+    def forget(self, token: int):
+        with self._started_lock:
+            self._started.pop(token, None)
+
+    def stop(self):
+        # ProcessPoolExecutor has no public way to stop a busy worker (before Python 3.14)
+        processes = list((self.executor._processes or {}).values())
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+
+
+def _acquire_pool() -> _WorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _WorkerPool()
+        _pool.users += 1
+        return _pool
+
+
+def _release_pool(pool: _WorkerPool):
+    with _pool_lock:
+        pool.users -= 1
+        stop = pool.retired and pool.users == 0
+    if stop:
+        pool.stop()
+
+
+def _retire_pool(pool: _WorkerPool):
+    """
+    Stops handing out `pool`. Only replaces the current pool if it is still this
+    one, so a call reporting an old pool never retires a newer one.
+    """
+    global _pool
+    with _pool_lock:
+        pool.retired = True
+        if _pool is pool:
+            _pool = None
+        stop = pool.users == 0
+    if stop:
+        pool.stop()
+
+
+def shutdown_workers(wait: bool = True):
+    """
+    Shuts the current worker pool down once its queued chunks are done; the next
+    call starts a fresh one.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.retired = True
+        pool.executor.shutdown(wait=wait)
+
+
+def iter_manager_reports(manager_ids: Optional[list[int]] = None, outputs=ALL_OUTPUTS) -> Iterator[ReportDTO]:
+    """
+    Generate reports for the given managers (all project owners by default) on the
+    process pool and yield them in completion order. `outputs` is passed through to
+    generate_manager_report. Every manager yields exactly one ReportDTO; check its
+    `error` for managers whose report (or whole chunk) failed.
+
+    At most one chunk per worker is in flight, so finished reports don't pile up in
+    memory when the consumer (e.g. a streaming RPC) is slower than the pool. The
+    pool is shared with concurrent calls, so a chunk's report_timeout_seconds per
+    manager only starts once a worker picks it up. A chunk that runs longer fails
+    with a timeout error for its managers and retires the pool; chunks of this call
+    that haven't started yet move to a fresh pool. If a worker crashes, the chunks
+    that were in flight on that pool fail instead of the whole call.
+    """
+    if manager_ids is None:
+        manager_ids = fetch_all_manager_ids()
+    if not manager_ids:
+        return
+
+    chunk_size = max(1, settings.report_chunk_size)
+    chunks = iter([manager_ids[i:i + chunk_size] for i in range(0, len(manager_ids), chunk_size)])
+    max_in_flight = max(1, settings.report_workers)
+
+    pool = _acquire_pool()
+    held = [pool]  # pools this call has acquired and not yet released
+    pending = {}  # future -> (chunk of manager ids, pool, token)
+
+    def _submit(chunk):
+        nonlocal pool
+        if pool.retired:
+            pool = _acquire_pool()
+            held.append(pool)
+        token = next(_chunk_tokens)
+        try:
+            future = pool.executor.submit(_render_chunk, chunk, outputs, token)
+        except BrokenProcessPool as e:
+            future = Future()
+            future.set_exception(e)
+        pending[future] = (chunk, pool, token)
+
+    def _drop(future):
+        chunk, chunk_pool, token = pending.pop(future)
+        chunk_pool.forget(token)
+        return chunk, chunk_pool
+
+    try:
+        for chunk in itertools.islice(chunks, max_in_flight):
+            _submit(chunk)
+
+        while pending:
+            deadlines, queued = {}, False
+            for future, (chunk, chunk_pool, token) in pending.items():
+                started = chunk_pool.started_at(token)
+                if started is None:
+                    queued = True
+                else:
+                    deadlines[future] = started + settings.report_timeout_seconds * len(chunk)
+            timeout = min(deadlines.values(), default=None)
+            if timeout is not None:
+                timeout = max(0.0, timeout - time.monotonic())
+            if queued:
+                timeout = _START_POLL_SECONDS if timeout is None else min(timeout, _START_POLL_SECONDS)
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, chunk_pool = _drop(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool as e:
+                    logger.error("Report worker pool crashed while rendering chunk %s", chunk)
+                    _retire_pool(chunk_pool)
+                    results = [ReportDTO.failed(manager_id, f"{type(e).__name__}: {e}") for manager_id in chunk]
+                except Exception as e:
+                    # Failed before any report was rendered, e.g. the bulk fetch
+                    logger.exception("Report chunk %s failed", chunk)
+                    results = [ReportDTO.failed(manager_id, f"{type(e).__name__}: {e}") for manager_id in chunk]
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    _submit(next_chunk)
+                yield from results
+
+            now = time.monotonic()
+            for future, deadline in deadlines.items():
+                if future in pending and deadline <= now and not future.done():
+                    # A stuck worker can't be interrupted: fail the chunk and retire its pool
+                    chunk, chunk_pool = _drop(future)
+                    logger.error("Report chunk %s timed out; retiring the report worker pool", chunk)
+                    _retire_pool(chunk_pool)
+                    error = f"Timed out after {settings.report_timeout_seconds * len(chunk):g} seconds"
+                    yield from (ReportDTO.failed(manager_id, error) for manager_id in chunk)
+
+            # Chunks still queued on a retired pool might never get a worker; start them again
+            for future, (chunk, chunk_pool, token) in list(pending.items()):
+                if chunk_pool.retired and not future.done() and chunk_pool.started_at(token) is None:
+                    future.cancel()
+                    _drop(future)
+                    _submit(chunk)
+
+            in_use = {id(chunk_pool) for _, chunk_pool, _ in pending.values()}
+            for old_pool in [p for p in held if p is not pool and id(p) not in in_use]:
+                held.remove(old_pool)
+                _release_pool(old_pool)
+    finally:
+        for future, (_, chunk_pool, token) in pending.items():
+            future.cancel()
+            chunk_pool.forget(token)
+        for held_pool in held:
+            _release_pool(held_pool)
@@ -1,82 +1,170 @@
-import sys
+import io
+import threading
 
-import matplotlib.pyplot as plt
-from pathlib import Path
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
 
 from config.settings import settings
+from dto.report_dto import ChartDTO
+
+# format -> (media type, file extension)
+CHART_FORMATS = {
+    "png": ("image/png", "png"),
+    "png-quantized": ("image/png", "png"),  # palette PNG, a fraction of the size
+    "svg": ("image/svg+xml", "svg"),  # vector, inlined into the HTML
+}
+
+if settings.chart_format not in CHART_FORMATS:
+    raise ValueError(f"CHART_FORMAT must be one of {sorted(CHART_FORMATS)}, got {settings.chart_format!r}")
+
+# Anything here changes the rendered images, so it is part of the report cache key
+CHART_SETTINGS = {
+    "format": settings.chart_format,
+    "dpi": 120,
+    "engine": "oo-templates",
+    "png_colors": settings.chart_png_colors,
+    "max_months": settings.chart_max_months,
+    "top_projects": settings.chart_top_projects,
+}
+
+# Keep SVG text as <text> (far smaller than glyph paths) and make element ids
+# deterministic so identical data gives identical bytes. Only read by the SVG backend.
+matplotlib.rcParams["svg.fonttype"] = "none"
+matplotlib.rcParams["svg.hashsalt"] = "report"
+
+# Show at most this many category labels on an x axis; the rest are thinned out
+MAX_X_LABELS = 24
+
+# Figure templates are per thread: a Figure must never be drawn from two threads at
+# once, but rebuilding axes, titles and labels for every chart is wasted work.
+_templates = threading.local()
+
+
+class _ChartTemplate:
+    """
+    A pre-built Figure/Axes pair for one chart type. Only the data artists change between renders.
+    """
 
-BASE_PATH = Path(__file__).parent / settings.diagrams_path
-
-def ensure_dir(path: Path):
-    path.mkdir(parents=True, exist_ok=True)
-
-
-def plot_monthly_hours(df, manager_id):
+    def __init__(self, figsize, title, xlabel, ylabel):
+        self.figure = Figure(figsize=figsize, dpi=CHART_SETTINGS["dpi"])
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.artists = []
+
+    def clear_data(self):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+
+    def set_categories(self, labels):
+        positions = range(len(labels))
+        step = max(1, -(-len(labels) // MAX_X_LABELS))
+        self.ax.set_xticks(
+            list(positions)[::step],
+            [str(label) for label in labels][::step],
+            rotation=45,
+            ha="right",
+        )
+        return list(positions)
+
+    def render(self) -> bytes:
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.figure.tight_layout()
+        buf = io.BytesIO()
+        chart_format = CHART_SETTINGS["format"]
+        if chart_format == "svg":
+            self.figure.savefig(buf, format="svg")
+        elif chart_format == "png-quantized":
+            rgba, size = self.figure.canvas.print_to_buffer()
+            image = Image.frombuffer("RGBA", size, rgba, "raw", "RGBA", 0, 1).convert("RGB")
+            image.quantize(colors=CHART_SETTINGS["png_colors"]).save(buf, format="PNG", optimize=True)
+        else:
+            self.figure.savefig(buf, format="png", dpi=CHART_SETTINGS["dpi"])
+        return buf.getvalue()
+
+
+def _template(name: str, figsize, title, xlabel, ylabel) -> _ChartTemplate:
+    template = getattr(_templates, name, None)
+    if template is None:
+        template = _ChartTemplate(figsize, title, xlabel, ylabel)
+        setattr(_templates, name, template)
+    return template
+
+
+def _monthly_template():
+    return _template("monthly_hours", (9, 4), "Monthly Total Hours", "Month", "Hours Worked")
+
+
+def _variance_template():
+    return _template("duration_variance", (10, 5), "Project Duration Variance (Days)", "Project", "Variance (Actual - Planned)")
+
+
+def _employee_template():
+    return _template("employee_hours", (12, 6), "Employee Hours per Project", "Project", "Hours")
+
+
+def _month_label(value):
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m")
+    return str(value)
+
+
+def plot_monthly_hours(df):
     """
     Create a line chart of monthly total hours for all projects (summed).
+    Takes the monthly_project_hours view or the SQL monthly totals (already one row per month).
     """
     if df.empty:
         return None
 
-    out_dir = BASE_PATH / Path(str(manager_id))
-    ensure_dir(out_dir)
-
     monthly = df.groupby("month")["totalMonthlyHours"].sum().reset_index()
 
     monthly = monthly.sort_values("month")
 
-    plt.figure(figsize=(9, 4))
-    plt.plot(monthly["month"], monthly["totalMonthlyHours"])
-    plt.title("Monthly Total Hours")
-    plt.xlabel("Month")
-    plt.ylabel("Hours Worked")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    template = _monthly_template()
+    template.clear_data()
+    x = template.set_categories([_month_label(month) for month in monthly["month"]])
+    line, = template.ax.plot(x, monthly["totalMonthlyHours"].to_numpy(), color="C0")
+    template.artists.append(line)
 
-    file_path = out_dir / "monthly_hours.png"
-    plt.savefig(file_path, dpi=120)
-    plt.close()
+    return template.render()
 
-    return file_path.as_uri()
 
-
-def plot_duration_variance(df, manager_id):
+def plot_duration_variance(df):
     """
     Bar chart of duration variance for each project.
     """
     if df.empty:
         return None
 
-    out_dir = BASE_PATH / Path(str(manager_id))
-    ensure_dir(out_dir)
-
     df_sorted = df.sort_values("durationVarianceDays", ascending=True)
 
-    plt.figure(figsize=(10, 5))
-    plt.bar(df_sorted["projectName"], df_sorted["durationVarianceDays"])
-    plt.title("Project Duration Variance (Days)")
-    plt.xlabel("Project")
-    plt.ylabel("Variance (Actual - Planned)")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    template = _variance_template()
+    template.clear_data()
+    x = template.set_categories(df_sorted["projectName"].tolist())
+    bars = template.ax.bar(x, df_sorted["durationVarianceDays"].to_numpy(), color="C0")
+    template.artists.append(bars)
 
-    file_path = out_dir / "duration_variance.png"
-    plt.savefig(file_path, dpi=120)
-    plt.close()
+    return template.render()
 
-    return file_path.as_uri()
 
-
-def plot_employee_hours(df, manager_id):
+def plot_employee_hours(df):
     """
     Stacked bar chart: total hours per project per employee.
+    Takes the project_employee_total_hours view or its top-N aggregate.
     """
     if df.empty:
         return None
 
-    out_dir = BASE_PATH / Path(str(manager_id))
-    ensure_dir(out_dir)
-
     pivot = df.pivot_table(
         index="projectName",
         columns="userName",
@@ -85,32 +173,47 @@ def plot_employee_hours(df, manager_id):
         fill_value=0
     )
 
-    plt.figure(figsize=(12, 6))
-    pivot.plot(kind="bar", stacked=True)
-    plt.title("Employee Hours per Project")
-    plt.xlabel("Project")
-    plt.ylabel("Hours")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    template = _employee_template()
+    template.clear_data()
+    x = template.set_categories(pivot.index.tolist())
+    bottom = None
+    for i, user in enumerate(pivot.columns):
+        heights = pivot[user].to_numpy(dtype=float)
+        bars = template.ax.bar(x, heights, width=0.5, bottom=bottom, label=str(user), color=f"C{i % 10}")
+        template.artists.append(bars)
+        bottom = heights if bottom is None else bottom + heights
+    template.ax.legend(title=pivot.columns.name)
 
-    file_path = out_dir / "employee_hours.png"
-    plt.savefig(file_path, dpi=120)
-    plt.close()
-
-    return file_path.as_uri()
+    return template.render()
 
 
 def generate_all_charts(
         project_hours_df,
         variance_df,
         monthly_df,
-        manager_id,
 ):
     """
-    Generate all charts for a given manager and return a dict of file paths.
+    Generate all charts for a given manager in the configured CHART_FORMAT and
+    return a dict of ChartDTOs (charts without data are left out).
+    Safe to call from several threads at once.
     """
+    media_type, extension = CHART_FORMATS[CHART_SETTINGS["format"]]
+    rendered = {
+        "monthly_hours": plot_monthly_hours(monthly_df),
+        "duration_variance": plot_duration_variance(variance_df),
+        "employee_hours": plot_employee_hours(project_hours_df),
+    }
     return {
-        "monthly_hours": plot_monthly_hours(monthly_df, manager_id),
-        "duration_variance": plot_duration_variance(variance_df, manager_id),
-        "employee_hours": plot_employee_hours(project_hours_df, manager_id),
-    }
\ No newline at end of file
+        key: ChartDTO(data=data, media_type=media_type, extension=extension)
+        for key, data in rendered.items()
+        if data
+    }
+
+
+def warm_up():
+    """
+    Build this thread's figure templates ahead of the first report.
+    """
+    _monthly_template()
+    _variance_template()
+    _employee_template()
@@ -1,10 +1,16 @@
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
 from pathlib import Path
+from typing import Optional
 
 from config.settings import settings
 
 TEMPLATE_DIR = Path(__file__).parent / settings.templates
 
+# The report stylesheet is kept out of report.html so the PDF engine can parse it
+# once per process. Client HTML still embeds it, so it renders standalone.
+REPORT_CSS = (TEMPLATE_DIR / "report.css").read_text(encoding="utf-8")
+INLINE_STYLESHEET = Markup(f"<style>\n{REPORT_CSS}</style>")
 
 env = Environment(
     loader=FileSystemLoader(TEMPLATE_DIR),
@@ -12,16 +18,33 @@ env = Environment(
 )
 
 
+def inline_svg(chart) -> Markup:
+    """
+    Jinja filter: an SVG ChartDTO as markup that can sit directly in the HTML body.
+    """
+    svg = chart.data.decode("utf-8")
+    return Markup(svg[svg.index("<svg"):])
+
+
+env.filters["inline_svg"] = inline_svg
+env.globals["inline_stylesheet"] = INLINE_STYLESHEET
+
+
 def generate_html_report(
         manager_name: str,
         project_hours_df,
         avg_duration_df,
         variance_df,
         monthly_df,
-        charts: dict
+        charts: dict,
+        period: Optional[str] = None,
+        windowed: bool = False,
 ) -> str:
     """
     Renders the HTML report for a manager using Jinja2.
+    `period` describes the report filter, if any, under the manager's name.
+    `windowed` marks a date-filtered report, whose employee hours and duration
+    variance sections are labelled as lifetime figures (see data.queries.filter_predicates).
     """
 
     template = env.get_template("report.html")
@@ -35,7 +58,31 @@ def generate_html_report(
         ),
         variance=variance_df.to_dict(orient="records"),
         monthly=monthly_df.to_dict(orient="records"),
-        charts=charts
+        charts=charts,
+        period=period,
+        windowed=windowed,
     )
 
     return html
+
+
+def chart_file_name(key: str, chart) -> str:
+    """
+    Name a chart is shipped under next to the HTML (gRPC Chart.filename, cid: references).
+    """
+    return f"{key}.{chart.extension}"
+
+
+def compact_html(html: str, charts: dict) -> str:
+    """
+    The self-contained report HTML with each embedded chart replaced by a
+    cid:<file name> reference, for clients that receive the chart bytes alongside
+    it. Works on the rendered (cached) HTML, so nothing is re-rendered.
+    """
+    for key, chart in charts.items():
+        ref = f"cid:{chart_file_name(key, chart)}"
+        if chart.extension == "svg":
+            html = html.replace(str(inline_svg(chart)), f'<img src="{ref}" alt="{key}">', 1)
+        else:
+            html = html.replace(f"data:{chart.media_type};base64,{chart.base64}", ref, 1)
+    return html
@@ -1,14 +1,58 @@
+import io
 import sys
-
-from weasyprint import HTML
+import threading
 from pathlib import Path
 
-def generate_pdf_from_html(html_content: str, output_path: str):
-    output_path = Path(output_path)
-    project_root = Path(sys.argv[0]).resolve().parent
-    current_base_url = project_root.as_uri()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    HTML(
-        string=html_content,
-        base_url=current_base_url
-    ).write_pdf(output_path)
\ No newline at end of file
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from reports.html_generator import INLINE_STYLESHEET, REPORT_CSS
+
+BASE_URL = Path(sys.argv[0]).resolve().parent.as_uri()
+
+# Font configuration and compiled stylesheet are per thread: WeasyPrint makes no
+# promise that they can be shared between concurrent renders.
+_engines = threading.local()
+
+
+class _PdfEngine:
+    """
+    Keeps the expensive WeasyPrint state alive between reports: the fontconfig
+    lookup behind FontConfiguration and the parsed report stylesheet.
+    """
+
+    def __init__(self):
+        self.font_config = FontConfiguration()
+        self.stylesheets = [CSS(string=REPORT_CSS, base_url=BASE_URL, font_config=self.font_config)]
+
+    def render(self, html_content: str) -> bytes:
+        # The embedded <style> is the same stylesheet; drop it instead of parsing it again
+        html_content = html_content.replace(INLINE_STYLESHEET, "", 1)
+        buf = io.BytesIO()
+        HTML(string=html_content, base_url=BASE_URL).write_pdf(
+            buf,
+            stylesheets=self.stylesheets,
+            font_config=self.font_config,
+        )
+        return buf.getvalue()
+
+
+def _engine() -> _PdfEngine:
+    engine = getattr(_engines, "engine", None)
+    if engine is None:
+        engine = _engines.engine = _PdfEngine()
+    return engine
+
+
+def render_pdf(html_content: str) -> bytes:
+    """
+    Renders the report HTML to PDF bytes in memory.
+    """
+    return _engine().render(html_content)
+
+
+def warm_up():
+    """
+    Build this thread's PDF engine and render a throwaway document so fonts are loaded up front.
+    """
+    _engine().render("<p>warm-up</p>")
@@ -0,0 +1,364 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from config.settings import settings
+from dto.report_dto import ChartDTO, ReportDataDTO, ReportFilter
+from reports.diagram_generator import CHART_SETTINGS
+from reports.html_generator import TEMPLATE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when CachedReport changes shape so old disk entries are never read back
+_ENTRY_FORMAT = "3"
+
+
+def _render_version() -> str:
+    """
+    Everything besides the data that changes the rendered output: the templates,
+    the chart settings and the cache entry format. Computed once per process.
+    """
+    h = hashlib.sha256()
+    h.update(_ENTRY_FORMAT.encode())
+    for path in sorted(Path(TEMPLATE_DIR).rglob("*")):
+        if path.is_file():
+            h.update(path.name.encode())
+            h.update(path.read_bytes())
+    h.update(repr(sorted(CHART_SETTINGS.items())).encode())
+    return h.hexdigest()[:16]
+
+
+RENDER_VERSION = _render_version()
+
+
+def _hash_frame(h, frame: pd.DataFrame):
+    h.update(",".join(f"{col}:{dtype}" for col, dtype in frame.dtypes.items()).encode())
+    h.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+
+
+def filter_scope(report_filter: Optional[ReportFilter]) -> str:
+    """
+    Short digest of a ReportFilter, separating its version refs and ETags from
+    those of the unfiltered report. Empty for no filter.
+    """
+    if report_filter is None:
+        return ""
+    return hashlib.sha1(report_filter.token.encode()).hexdigest()[:12]
+
+
+def report_etag(version: Optional[str], report_filter: Optional[ReportFilter] = None) -> Optional[str]:
+    """
+    HTTP entity tag for a manager's report given its data version token
+    (see data.queries.fetch_manager_versions) and filter. None if the version is unknown.
+    """
+    if not version:
+        return None
+    scope = filter_scope(report_filter)
+    return f'"{RENDER_VERSION}-{version}-{scope}"' if scope else f'"{RENDER_VERSION}-{version}"'
+
+
+def make_cache_key(data: ReportDataDTO) -> str:
+    """
+    Content address of a report: the four fetched frames, the manager name, the
+    filter and the render version. Same key means byte-identical output.
+    """
+    h = hashlib.sha256()
+    h.update(RENDER_VERSION.encode())
+    h.update(f"{data.manager_id}|{data.manager_name}".encode())
+    if data.report_filter is not None:
+        h.update(f"|{data.report_filter.token}".encode())
+    for frame in (data.project_hours, data.avg_duration, data.variance, data.monthly,
+                  data.monthly_totals, data.employee_hours):
+        if frame is None:
+            h.update(b"-")
+        else:
+            _hash_frame(h, frame)
+    return h.hexdigest()
+
+
+def _ref_size(ref: tuple) -> int:
+    # bytes of the version file holding this ref
+    return len(" ".join(ref))
+
+
+@dataclass
+class CachedReport:
+    manager_name: Optional[str]
+    html: str
+    pdf: Optional[bytes]  # None if only HTML/charts were ever requested
+    charts: Dict[str, ChartDTO] = field(default_factory=dict)
+
+
+class ReportCache:
+    """
+    Two-tier LRU: a small in-memory tier in front of a size-bounded directory of
+    pickled entries. The disk tier is shared by every process using the same
+    directory (e.g. the batch workers); each process enforces the byte bound on
+    the entries it knows about.
+
+    Version refs (manager, filter scope -> cache key, see key_for_version) count
+    against the disk bound and are evicted with the entry they point to, so
+    arbitrary filters cannot grow the directory or the process without limit.
+    """
+
+    def __init__(self, directory: Path, memory_entries: int, disk_bytes: int):
+        self.directory = Path(directory)
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._disk_total = 0
+        self._versions: Dict[tuple, tuple] = {}  # (manager_id, scope) -> (render version, data version, cache key)
+        self._refs: Dict[str, set] = {}  # cache key -> {(manager_id, scope)} pointing at it
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+        self._load_disk_index()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def _load_disk_index(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path.stem, st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_total += size
+
+        for path in self.directory.glob("manager_*.version"):
+            _, manager_id, *scope = path.stem.split("_", 2)
+            try:
+                ref = tuple(path.read_text().split())
+                ref_id = (int(manager_id), scope[0] if scope else "")
+            except (OSError, ValueError):
+                continue
+            if len(ref) == 3 and ref[2] in self._disk:
+                self._add_ref(ref_id, ref)
+            else:
+                # Points at an evicted entry or is unreadable: dead weight
+                path.unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[CachedReport]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                entry = pickle.load(fh)
+            os.utime(path)
+            size = path.stat().st_size
+        except FileNotFoundError:
+            # Never written, or evicted by another process sharing the directory
+            self._remove_disk(key)
+            entry = None
+        except Exception:
+            logger.exception("Dropping unreadable report cache entry %s", path)
+            self._remove_disk(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            else:
+                # Written by another process sharing the directory; count it from now on
+                self._disk[key] = size
+                self._disk_total += size
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key: str, entry: CachedReport):
+        payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as fh:
+                fh.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception("Failed to write report cache entry %s", path)
+            tmp_path.unlink(missing_ok=True)
+
+        with self._lock:
+            self._remember(key, entry)
+            self._disk_total += len(payload) - self._disk.pop(key, 0)
+            self._disk[key] = len(payload)
+            stale = self._evict_over_budget()
+
+        for stale_path in stale:
+            stale_path.unlink(missing_ok=True)
+
+    def _evict_over_budget(self) -> list[Path]:
+        # caller holds the lock; returns the files to delete once it is released
+        stale = []
+        while self._disk_total > self.disk_bytes and len(self._disk) > 1:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_total -= size
+            self._stats["disk_evictions"] += 1
+            stale.append(self._path(old_key))
+            stale.extend(self._drop_refs_to(old_key))
+        return stale
+
+    def _add_ref(self, ref_id: tuple, ref: tuple):
+        # caller holds the lock
+        old = self._versions.pop(ref_id, None)
+        if old is not None:
+            self._disk_total -= _ref_size(old)
+            siblings = self._refs[old[2]]
+            siblings.discard(ref_id)
+            if not siblings:
+                del self._refs[old[2]]
+        self._versions[ref_id] = ref
+        self._refs.setdefault(ref[2], set()).add(ref_id)
+        self._disk_total += _ref_size(ref)
+
+    def _drop_refs_to(self, key: str) -> list[Path]:
+        # caller holds the lock; returns the version files to delete
+        paths = []
+        for ref_id in self._refs.pop(key, ()):
+            self._disk_total -= _ref_size(self._versions.pop(ref_id))
+            paths.append(self._version_path(*ref_id))
+        return paths
+
+    def _version_path(self, manager_id: int, scope: str = "") -> Path:
+        suffix = f"_{scope}" if scope else ""
+        return self.directory / f"manager_{manager_id}{suffix}.version"
+
+    def key_for_version(self, manager_id: int, version: Optional[str], scope: str = "") -> Optional[str]:
+        """
+        Cache key of the report last rendered for this manager at this data version,
+        so an unchanged manager can be served without fetching any view data.
+        `scope` (see filter_scope) keeps filtered reports apart from the full one.
+        """
+        if not version:
+            return None
+        with self._lock:
+            ref = self._versions.get((manager_id, scope))
+        if ref is None:
+            try:
+                ref = tuple(self._version_path(manager_id, scope).read_text().split())
+            except OSError:
+                return None
+        if len(ref) == 3 and ref[0] == RENDER_VERSION and ref[1] == version:
+            return ref[2]
+        return None
+
+    def set_version(self, manager_id: int, version: Optional[str], key: str, scope: str = ""):
+        if not version:
+            return
+        with self._lock:
+            if key not in self._disk:
+                # The entry failed to write or is already evicted; a ref to it would never be cleaned up
+                return
+        ref = (RENDER_VERSION, version, key)
+        path = self._version_path(manager_id, scope)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_text(" ".join(ref))
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception("Failed to write report version %s", path)
+            tmp_path.unlink(missing_ok=True)
+        with self._lock:
+            if key in self._disk:
+                self._add_ref((manager_id, scope), ref)
+                stale = self._evict_over_budget()
+            else:
+                # Evicted while the ref was written
+                stale = [path]
+        for stale_path in stale:
+            stale_path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, entry: CachedReport):
+        # caller holds the lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _remove_disk(self, key: str):
+        self._path(key).unlink(missing_ok=True)
+        with self._lock:
+            self._disk_total -= self._disk.pop(key, 0)
+            stale = self._drop_refs_to(key)
+        for stale_path in stale:
+            stale_path.unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._disk.clear()
+            self._disk_total = 0
+            self._versions.clear()
+            self._refs.clear()
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+        for path in self.directory.glob("manager_*.version"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.memory_entries,
+                "disk_entries": len(self._disk),
+                "version_refs": len(self._versions),
+                "disk_bytes": self._disk_total,
+                "disk_capacity_bytes": self.disk_bytes,
+                "render_version": RENDER_VERSION,
+            }
+
+
+_cache: Optional[ReportCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """
+    Process-wide cache instance, or None when REPORT_CACHE_ENABLED is false.
+    """
+    global _cache
+    if not settings.report_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReportCache(
+                directory=Path(settings.report_cache_dir),
+                memory_entries=settings.report_cache_memory_entries,
+                disk_bytes=settings.report_cache_disk_bytes,
+            )
+        return _cache
@@ -1,79 +1,172 @@
-import base64
 from datetime import datetime
-from pathlib import Path
-from urllib.parse import urlparse
+from typing import Optional
 
-from config.settings import settings
-from dto.report_dto import ReportDTO
+from dto.report_dto import ReportDTO, ReportDataDTO, ReportFilter
 from reports.diagram_generator import (
     generate_all_charts
 )
 
 from reports.html_generator import generate_html_report
-from reports.pdf_generator import generate_pdf_from_html
-
-from data.queries import (
-    get_project_employee_total_hours_by_manager,
-    get_avg_completed_project_duration_hours_by_manager,
-    get_project_duration_variance_hours_by_manager,
-    get_monthly_project_hours_hours_by_manager,
-    fetch_manager
-)
+from reports.pdf_generator import render_pdf
+from reports.report_cache import CachedReport, filter_scope, get_report_cache, make_cache_key
+
+from data.queries import fetch_manager_version, fetch_report_data
+from telemetry.metrics import REPORTS_IN_PROGRESS, stage
+
+
+OUTPUT_HTML = "html"
+OUTPUT_PDF = "pdf"
+OUTPUT_CHARTS = "charts"
+ALL_OUTPUTS = frozenset({OUTPUT_HTML, OUTPUT_PDF, OUTPUT_CHARTS})
+
+
+def generate_manager_report(
+        manager_id: int,
+        data: Optional[ReportDataDTO] = None,
+        version: Optional[str] = None,
+        outputs=ALL_OUTPUTS,
+        report_filter: Optional[ReportFilter] = None,
+):
+    """
+    Build the requested outputs (OUTPUT_HTML, OUTPUT_PDF, OUTPUT_CHARTS) for a manager.
+    Outputs that weren't requested are left empty: without OUTPUT_PDF, WeasyPrint is never called.
+    Pass pre-fetched `data` (e.g. from fetch_report_data_for_managers) to skip the per-manager queries.
+    If the report cache already holds a report for identical data, nothing is rendered.
+
+    `version` is the manager's change token from fetch_manager_versions; without
+    pre-fetched data it is probed here, and an unchanged manager is answered from
+    the cache without fetching any view data.
+
+    `report_filter` restricts the report to a date range and/or projects; the filter
+    is pushed down into the view queries. Pre-fetched `data` carries its own filter.
+
+    Each stage is timed (see telemetry.metrics).
+    """
+    with REPORTS_IN_PROGRESS.track_inprogress():
+        return _generate_manager_report(manager_id, data, version, frozenset(outputs), report_filter)
+
 
+def _generate_manager_report(manager_id: int, data: Optional[ReportDataDTO], version: Optional[str],
+                             outputs: frozenset, report_filter: Optional[ReportFilter]) -> ReportDTO:
+    cache = get_report_cache()
 
-def generate_manager_report(manager_id: int):
+    if data is None:
+        if cache is not None and version is None:
+            with stage("version_probe"):
+                version = fetch_manager_version(manager_id)
+        cached = cached_report_for_version(manager_id, version, outputs, report_filter)
+        if cached is not None:
+            return cached
+        with stage("fetch"):
+            data = fetch_report_data(manager_id, report_filter)
+    report_filter = data.report_filter
+    scope = filter_scope(report_filter)
 
-    manager_name = fetch_manager(manager_id)
+    cache_key = make_cache_key(data) if cache is not None else None
+    if cache is not None:
+        with stage("cache_lookup"):
+            cached = cache.get(cache_key)
+        if cached is not None:
+            cache.set_version(manager_id, version, cache_key, scope)
+            return _report_from_cache(manager_id, cache, cache_key, cached, outputs)
 
-    df_hours = get_project_employee_total_hours_by_manager(manager_id)
-    df_avg = get_avg_completed_project_duration_hours_by_manager(manager_id)
-    df_variance = get_project_duration_variance_hours_by_manager(manager_id)
-    df_monthly = get_monthly_project_hours_hours_by_manager(manager_id)
+    manager_name = data.manager_name
 
-    charts = generate_all_charts(df_hours, df_variance, df_monthly, manager_id)
+    df_hours = data.project_hours
+    df_avg = data.avg_duration
+    df_variance = data.variance
+    df_monthly = data.monthly
 
-    base64_charts = {}
+    # Charts prefer the SQL-side aggregates: a handful of rows instead of the full views
+    with stage("charts"):
+        charts = generate_all_charts(
+            data.employee_hours if data.employee_hours is not None else df_hours,
+            df_variance,
+            data.monthly_totals if data.monthly_totals is not None else df_monthly,
+        )
 
-    for key, path in charts.items():
-        if not path:
-            continue
-        try:
-            parsed_uri = urlparse(path)
-            path_segment = parsed_uri.path
-            # Keep the leading slash for absolute paths
-            local_path = Path(path_segment) if path_segment.startswith('/') else Path(path_segment[1:])
-            with open(local_path, "rb") as fh:
-                data = fh.read()
-        except Exception:
-            data = ""
+    with stage("html"):
+        html = generate_html_report(
+            manager_name=manager_name,
+            project_hours_df=df_hours,
+            avg_duration_df=df_avg,
+            variance_df=df_variance,
+            monthly_df=df_monthly,
+            charts=charts,
+            period=report_filter.label if report_filter is not None else None,
+            windowed=report_filter is not None and report_filter.has_dates,
+        )
 
-        if data:
-            # Convert raw bytes (data) into a Base64 string (bytes)
-            base64_string = base64.b64encode(data).decode('utf-8')
-        else:
-            base64_string = b""
-        base64_charts[key] = base64_string
+    pdf_bytes = None
+    if OUTPUT_PDF in outputs:
+        with stage("pdf"):
+            pdf_bytes = render_pdf(html)
 
-    html = generate_html_report(
+    if cache is not None:
+        with stage("cache_store"):
+            cache.put(cache_key, CachedReport(
+                manager_name=manager_name,
+                html=html,
+                pdf=pdf_bytes,
+                charts=charts,
+            ))
+            cache.set_version(manager_id, version, cache_key, scope)
+
+    return ReportDTO(
+        manager_id=manager_id,
         manager_name=manager_name,
-        project_hours_df=df_hours,
-        avg_duration_df=df_avg,
-        variance_df=df_variance,
-        monthly_df=df_monthly,
-        charts=base64_charts
+        html=html if OUTPUT_HTML in outputs else "",
+        pdf=pdf_bytes,
+        charts=charts if OUTPUT_CHARTS in outputs else {},
+        file_name=_pdf_file_name(manager_id) if pdf_bytes is not None else None
     )
 
+
+def cached_report_for_version(manager_id: int, version: Optional[str], outputs=ALL_OUTPUTS,
+                              report_filter: Optional[ReportFilter] = None) -> Optional[ReportDTO]:
+    """
+    The cached report for this manager and filter if its data version is unchanged, else None.
+    """
+    cache = get_report_cache()
+    if cache is None:
+        return None
+    with stage("cache_lookup"):
+        cache_key = cache.key_for_version(manager_id, version, filter_scope(report_filter))
+        cached = cache.get(cache_key) if cache_key is not None else None
+    if cached is None:
+        return None
+    return _report_from_cache(manager_id, cache, cache_key, cached, frozenset(outputs))
+
+
+def _pdf_file_name(manager_id: int) -> str:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_name = f"/manager_{manager_id}_{timestamp}.pdf"
-    pdf_path = settings.pdf_path + file_name
+    return f"manager_{manager_id}_{timestamp}.pdf"
+
 
-    generate_pdf_from_html(html, pdf_path)
+def _report_from_cache(manager_id: int, cache, cache_key: str, cached: CachedReport, outputs) -> ReportDTO:
+    """
+    Builds the requested outputs from a cache entry.
+    Only a PDF that was never requested before (cached from an HTML-only call) is
+    rendered, from the cached HTML; charts and HTML are never re-rendered.
+    """
+    if OUTPUT_PDF in outputs and cached.pdf is None:
+        with stage("pdf"):
+            pdf_bytes = render_pdf(cached.html)
+        cached = CachedReport(
+            manager_name=cached.manager_name,
+            html=cached.html,
+            pdf=pdf_bytes,
+            charts=cached.charts,
+        )
+        with stage("cache_store"):
+            cache.put(cache_key, cached)
+    pdf_bytes = cached.pdf if OUTPUT_PDF in outputs else None
 
     return ReportDTO(
         manager_id=manager_id,
-        manager_name=manager_name,
-        html=html,
-        pdf_path=str(pdf_path),
-        charts=charts,
-        file_name=file_name
-    )
\ No newline at end of file
+        manager_name=cached.manager_name,
+        html=cached.html if OUTPUT_HTML in outputs else "",
+        pdf=pdf_bytes,
+        charts=dict(cached.charts) if OUTPUT_CHARTS in outputs else {},
+        file_name=_pdf_file_name(manager_id) if pdf_bytes is not None else None
+    )
@@ -0,0 +1,76 @@
+import io
+import time
+import zipfile
+from typing import Callable, Iterator, Optional
+
+from dto.report_dto import ReportDTO
+from reports.batch_generator import iter_manager_reports
+from reports.report_generator import OUTPUT_HTML, OUTPUT_PDF
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """
+    Write-only, non-seekable sink for ZipFile. Whatever has been written since the
+    last drain() is handed out and forgotten, so the archive never sits in memory.
+    ZipFile sees that it can't seek and writes data descriptors after each entry.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _entry(name: str, compress_type: int) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+def iter_manager_reports_zip(
+        manager_ids: Optional[list[int]] = None,
+        include_html: bool = False,
+        on_report: Optional[Callable[[ReportDTO], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Yields a ZIP archive of every manager's PDF (and HTML if include_html) piece by
+    piece, as reports come off the process pool. Each report is written and yielded
+    as soon as it is done; memory use doesn't grow with the number of managers.
+    A manager whose report failed gets a manager_<id>.error.txt entry instead.
+
+    `on_report` is called after each report's entries are written (e.g. for progress),
+    failed ones included; check `report.error`.
+    """
+    outputs = {OUTPUT_PDF, OUTPUT_HTML} if include_html else {OUTPUT_PDF}
+    buf = _ChunkBuffer()
+
+    with zipfile.ZipFile(buf, "w") as archive:
+        for report in iter_manager_reports(manager_ids, outputs=outputs):
+            name = f"manager_{report.manager_id}"
+            if report.error:
+                archive.writestr(_entry(f"{name}.error.txt", zipfile.ZIP_DEFLATED), report.error)
+                if on_report is not None:
+                    on_report(report)
+                yield buf.drain()
+                continue
+            # PDFs are already compressed; storing them keeps the archive cheap to build
+            archive.writestr(_entry(f"{name}.pdf", zipfile.ZIP_STORED), report.pdf)
+            if include_html:
+                archive.writestr(_entry(f"{name}.html", zipfile.ZIP_DEFLATED), report.html)
+            if on_report is not None:
+                on_report(report)
+            yield buf.drain()
+
+    # Central directory
+    yield buf.drain()
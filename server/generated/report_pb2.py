@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0creport.proto\x12\x10server.generated\"$\n\x0eManagerRequest\x12\x12\n\nmanager_id\x18\x01 \x01(\x03\"\x1c\n\x0cHTMLResponse\x12\x0c\n\x04html\x18\x01 \x01(\t\"\x1a\n\x0bPDFResponse\x12\x0b\n\x03pdf\x18\x01 \x01(\x0c\"6\n\x05\x43hart\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"}\n\rManagerReport\x12\x12\n\nmanager_id\x18\x01 \x01(\x03\x12\x14\n\x0cmanager_name\x18\x02 \x01(\t\x12\x0c\n\x04html\x18\x03 \x01(\t\x12\x0b\n\x03pdf\x18\x04 \x01(\x0c\x12\'\n\x06\x63harts\x18\x05 \x03(\x0b\x32\x17.server.generated.Chart\"F\n\x12\x41llReportsResponse\x12\x30\n\x07reports\x18\x01 \x03(\x0b\x32\x1f.server.generated.ManagerReport\"\x0e\n\x0c\x45mptyRequest2\xf5\x02\n\rReportService\x12R\n\x0eGetManagerHTML\x12 .server.generated.ManagerRequest\x1a\x1e.server.generated.HTMLResponse\x12P\n\rGetManagerPDF\x12 .server.generated.ManagerRequest\x1a\x1d.server.generated.PDFResponse\x12`\n\x16GetAllReportsOfManager\x12 .server.generated.ManagerRequest\x1a$.server.generated.AllReportsResponse\x12\\\n\x14GetAllManagerReports\x12\x1e.server.generated.EmptyRequest\x1a$.server.generated.AllReportsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0creport.proto\x12\x10server.generated\"n\n\x0eManagerRequest\x12\x12\n\nmanager_id\x18\x01 \x01(\x03\x12\x11\n\tfrom_date\x18\x02 \x01(\t\x12\x0f\n\x07to_date\x18\x03 \x01(\t\x12\x13\n\x0bproject_ids\x18\x04 \x03(\x03\x12\x0f\n\x07\x63ompact\x18\x05 \x01(\x08\"\x1c\n\x0cHTMLResponse\x12\x0c\n\x04html\x18\x01 \x01(\t\"\x1a\n\x0bPDFResponse\x12\x0b\n\x03pdf\x18\x01 \x01(\x0c\"m\n\x08PDFChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x12\n\ntotal_size\x18\x03 \x01(\x03\x12\x0c\n\x04last\x18\x04 \x01(\x08\x12\x0e\n\x06sha256\x18\x05 \x01(\t\x12\x11\n\tfile_name\x18\x06 \x01(\t\"6\n\x05\x43hart\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"\x8c\x01\n\rManagerReport\x12\x12\n\nmanager_id\x18\x01 \x01(\x03\x12\x14\n\x0cmanager_name\x18\x02 \x01(\t\x12\x0c\n\x04html\x18\x03 \x01(\t\x12\x0b\n\x03pdf\x18\x04 \x01(\x0c\x12\'\n\x06\x63harts\x18\x05 \x03(\x0b\x32\x17.server.generated.Chart\x12\r\n\x05\x65rror\x18\x06 \x01(\t\"F\n\x12\x41llReportsResponse\x12\x30\n\x07reports\x18\x01 \x03(\x0b\x32\x1f.server.generated.ManagerReport\"\x1f\n\x0c\x45mptyRequest\x12\x0f\n\x07\x63ompact\x18\x01 \x01(\x08\x32\xa7\x04\n\rReportService\x12R\n\x0eGetManagerHTML\x12 .server.generated.ManagerRequest\x1a\x1e.server.generated.HTMLResponse\x12P\n\rGetManagerPDF\x12 .server.generated.ManagerRequest\x1a\x1d.server.generated.PDFResponse\x12R\n\x10StreamManagerPDF\x12 .server.generated.ManagerRequest\x1a\x1a.server.generated.PDFChunk0\x01\x12`\n\x16GetAllReportsOfManager\x12 .server.generated.ManagerRequest\x1a$.server.generated.AllReportsResponse\x12\\\n\x14GetAllManagerReports\x12\x1e.server.generated.EmptyRequest\x1a$.server.generated.AllReportsResponse\x12\\\n\x17StreamAllManagerReports\x12\x1e.server.generated.EmptyRequest\x1a\x1f.server.generated.ManagerReport0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,19 +32,21 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'report_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_MANAGERREQUEST']._serialized_start=34
-  _globals['_MANAGERREQUEST']._serialized_end=70
-  _globals['_HTMLRESPONSE']._serialized_start=72
-  _globals['_HTMLRESPONSE']._serialized_end=100
-  _globals['_PDFRESPONSE']._serialized_start=102
-  _globals['_PDFRESPONSE']._serialized_end=128
-  _globals['_CHART']._serialized_start=130
-  _globals['_CHART']._serialized_end=184
-  _globals['_MANAGERREPORT']._serialized_start=186
-  _globals['_MANAGERREPORT']._serialized_end=311
-  _globals['_ALLREPORTSRESPONSE']._serialized_start=313
-  _globals['_ALLREPORTSRESPONSE']._serialized_end=383
-  _globals['_EMPTYREQUEST']._serialized_start=385
-  _globals['_EMPTYREQUEST']._serialized_end=399
-  _globals['_REPORTSERVICE']._serialized_start=402
-  _globals['_REPORTSERVICE']._serialized_end=775
+  _globals['_MANAGERREQUEST']._serialized_end=144
+  _globals['_HTMLRESPONSE']._serialized_start=146
+  _globals['_HTMLRESPONSE']._serialized_end=174
+  _globals['_PDFRESPONSE']._serialized_start=176
+  _globals['_PDFRESPONSE']._serialized_end=202
+  _globals['_PDFCHUNK']._serialized_start=204
+  _globals['_PDFCHUNK']._serialized_end=313
+  _globals['_CHART']._serialized_start=315
+  _globals['_CHART']._serialized_end=369
+  _globals['_MANAGERREPORT']._serialized_start=372
+  _globals['_MANAGERREPORT']._serialized_end=512
+  _globals['_ALLREPORTSRESPONSE']._serialized_start=514
+  _globals['_ALLREPORTSRESPONSE']._serialized_end=584
+  _globals['_EMPTYREQUEST']._serialized_start=586
+  _globals['_EMPTYREQUEST']._serialized_end=617
+  _globals['_REPORTSERVICE']._serialized_start=620
+  _globals['_REPORTSERVICE']._serialized_end=1171
 # @@protoc_insertion_point(module_scope)
@@ -44,6 +44,11 @@ class ReportServiceStub(object):
                 request_serializer=report__pb2.ManagerRequest.SerializeToString,
                 response_deserializer=report__pb2.PDFResponse.FromString,
                 _registered_method=True)
+        self.StreamManagerPDF = channel.unary_stream(
+                '/server.generated.ReportService/StreamManagerPDF',
+                request_serializer=report__pb2.ManagerRequest.SerializeToString,
+                response_deserializer=report__pb2.PDFChunk.FromString,
+                _registered_method=True)
         self.GetAllReportsOfManager = channel.unary_unary(
                 '/server.generated.ReportService/GetAllReportsOfManager',
                 request_serializer=report__pb2.ManagerRequest.SerializeToString,
@@ -54,6 +59,11 @@ class ReportServiceStub(object):
                 request_serializer=report__pb2.EmptyRequest.SerializeToString,
                 response_deserializer=report__pb2.AllReportsResponse.FromString,
                 _registered_method=True)
+        self.StreamAllManagerReports = channel.unary_stream(
+                '/server.generated.ReportService/StreamAllManagerReports',
+                request_serializer=report__pb2.EmptyRequest.SerializeToString,
+                response_deserializer=report__pb2.ManagerReport.FromString,
+                _registered_method=True)
 
 
 class ReportServiceServicer(object):
@@ -71,6 +81,13 @@ class ReportServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamManagerPDF(self, request, context):
+        """Same PDF as GetManagerPDF, in GRPC_PDF_CHUNK_KB chunks, so size is not bounded by the message limit
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetAllReportsOfManager(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -83,6 +100,13 @@ class ReportServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamAllManagerReports(self, request, context):
+        """Same reports as GetAllManagerReports, sent one message per manager as soon as each is rendered
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ReportServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -96,6 +120,11 @@ def add_ReportServiceServicer_to_server(servicer, server):
                     request_deserializer=report__pb2.ManagerRequest.FromString,
                     response_serializer=report__pb2.PDFResponse.SerializeToString,
             ),
+            'StreamManagerPDF': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamManagerPDF,
+                    request_deserializer=report__pb2.ManagerRequest.FromString,
+                    response_serializer=report__pb2.PDFChunk.SerializeToString,
+            ),
             'GetAllReportsOfManager': grpc.unary_unary_rpc_method_handler(
                     servicer.GetAllReportsOfManager,
                     request_deserializer=report__pb2.ManagerRequest.FromString,
@@ -106,6 +135,11 @@ def add_ReportServiceServicer_to_server(servicer, server):
                     request_deserializer=report__pb2.EmptyRequest.FromString,
                     response_serializer=report__pb2.AllReportsResponse.SerializeToString,
             ),
+            'StreamAllManagerReports': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamAllManagerReports,
+                    request_deserializer=report__pb2.EmptyRequest.FromString,
+                    response_serializer=report__pb2.ManagerReport.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'server.generated.ReportService', rpc_method_handlers)
@@ -171,6 +205,33 @@ class ReportService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamManagerPDF(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/server.generated.ReportService/StreamManagerPDF',
+            report__pb2.ManagerRequest.SerializeToString,
+            report__pb2.PDFChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetAllReportsOfManager(request,
             target,
@@ -224,3 +285,30 @@ class ReportService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamAllManagerReports(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/server.generated.ReportService/StreamAllManagerReports',
+            report__pb2.EmptyRequest.SerializeToString,
+            report__pb2.ManagerReport.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,102 @@
+"""
+Client side of the report service: channels configured like the server (message
+size limits, compression, auth metadata) and a PDF download that writes
+StreamManagerPDF chunks to disk as they arrive.
+
+    python -m server.grpc_client 42 --out manager_42.pdf --from 2024-01-01 --to 2024-06-30
+"""
+import argparse
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import grpc
+
+from config.settings import settings
+from dto.report_dto import ReportFilter
+from server.generated import report_pb2, report_pb2_grpc
+from server.grpc_options import default_compression, message_size_options
+
+
+def create_channel(target: Optional[str] = None) -> grpc.Channel:
+    """
+    An insecure channel to `target` (default GRPC_HOST:GRPC_PORT) with the same
+    message size limits and default compression as the server.
+    """
+    target = target or f"{settings.grpc_host}:{settings.grpc_port}"
+    return grpc.insecure_channel(target, options=message_size_options(), compression=default_compression())
+
+
+def auth_metadata() -> tuple:
+    return (("authorization", f"Bearer {settings.api_key}"),)
+
+
+def manager_request(manager_id: int, report_filter: Optional[ReportFilter] = None) -> report_pb2.ManagerRequest:
+    request = report_pb2.ManagerRequest(manager_id=manager_id)
+    if report_filter is not None:
+        request.from_date = report_filter.from_date.isoformat() if report_filter.from_date else ""
+        request.to_date = report_filter.to_date.isoformat() if report_filter.to_date else ""
+        request.project_ids.extend(report_filter.project_ids)
+    return request
+
+
+def stream_manager_pdf(stub, request: report_pb2.ManagerRequest, out) -> tuple[str, int]:
+    """
+    Calls StreamManagerPDF and writes the chunks to the binary file object `out` as
+    they arrive. Returns (server file name, size). Raises ValueError if chunks arrive
+    out of order, the stream ends early, or the checksum does not match.
+    """
+    digest = hashlib.sha256()
+    file_name, written, complete = "", 0, False
+    # Read to the end of the stream, so the call finishes normally on both sides
+    for chunk in stub.StreamManagerPDF(request, metadata=auth_metadata()):
+        if complete or chunk.offset != written:
+            raise ValueError(f"PDF chunk at offset {chunk.offset}, expected {written}")
+        file_name = file_name or chunk.file_name
+        out.write(chunk.data)
+        digest.update(chunk.data)
+        written += len(chunk.data)
+        if chunk.last:
+            if written != chunk.total_size or digest.hexdigest() != chunk.sha256:
+                raise ValueError("PDF checksum mismatch")
+            complete = True
+    if not complete:
+        raise ValueError(f"PDF stream ended after {written} bytes without a last chunk")
+    return file_name, written
+
+
+def download_manager_pdf(manager_id: int, path: Optional[Path] = None,
+                         report_filter: Optional[ReportFilter] = None, target: Optional[str] = None) -> Path:
+    """
+    Streams a manager's PDF to `path` (default: the server's file name in the
+    current directory). A partial file is removed if the download fails.
+    """
+    with create_channel(target) as channel:
+        stub = report_pb2_grpc.ReportServiceStub(channel)
+        part = Path(path or f"manager_{manager_id}.pdf").with_suffix(".part")
+        try:
+            with open(part, "wb") as fh:
+                file_name, _ = stream_manager_pdf(stub, manager_request(manager_id, report_filter), fh)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+    return part.replace(Path(path) if path else part.with_name(file_name or f"manager_{manager_id}.pdf"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manager_id", type=int)
+    parser.add_argument("--out", type=Path, help="output file (default: the server's file name)")
+    parser.add_argument("--target", help="host:port (default: GRPC_HOST:GRPC_PORT)")
+    parser.add_argument("--from", dest="from_date")
+    parser.add_argument("--to", dest="to_date")
+    parser.add_argument("--project", dest="project_ids", type=int, action="append")
+    args = parser.parse_args()
+
+    report_filter = ReportFilter.parse(args.from_date, args.to_date, args.project_ids)
+    path = download_manager_pdf(args.manager_id, args.out, report_filter, args.target)
+    print(f"Saved {path} ({path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import grpc
+
+from config.settings import settings
+
+COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+if settings.grpc_compression not in COMPRESSION:
+    raise ValueError(f"GRPC_COMPRESSION must be one of {tuple(COMPRESSION)}, got {settings.grpc_compression!r}")
+
+
+def max_message_bytes() -> int:
+    return settings.grpc_max_message_mb * 1024 * 1024
+
+
+def message_size_options() -> list[tuple[str, int]]:
+    """
+    Channel/server options raising gRPC's default 4 MB receive limit (and setting the
+    send limit) to GRPC_MAX_MESSAGE_MB. Server and clients must agree on these.
+    """
+    return [
+        ("grpc.max_send_message_length", max_message_bytes()),
+        ("grpc.max_receive_message_length", max_message_bytes()),
+    ]
+
+
+def default_compression() -> grpc.Compression:
+    return COMPRESSION[settings.grpc_compression]
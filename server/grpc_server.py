@@ -21,7 +21,9 @@ else:
 
 from config.settings import settings
 from server.generated import report_pb2, report_pb2_grpc
+from server.grpc_options import default_compression, message_size_options
 from server.service_impl import ReportServiceServicer
+from telemetry.metrics import start_metrics_server
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -75,7 +77,9 @@ def serve():
 
     server = grpc.server(
         futures.ThreadPoolExecutor(max_workers=10),
-        interceptors=(interceptor,)
+        interceptors=(interceptor,),
+        options=message_size_options(),
+        compression=default_compression(),
     )
 
     report_pb2_grpc.add_ReportServiceServicer_to_server(ReportServiceServicer(), server)
@@ -84,6 +88,10 @@ def serve():
 
     logger.info("gRPC server started and listening on %s", server_address)
 
+    if settings.grpc_metrics_port:
+        start_metrics_server(settings.grpc_metrics_port, host)
+        logger.info("Prometheus metrics on %s:%s/metrics", host, settings.grpc_metrics_port)
+
     def _graceful_shutdown(signum, frame):
         logger.info("Signal %s received: stopping gRPC server...", signum)
         server.stop(0)
@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import settings
+from telemetry.metrics import RENDER_QUEUE_DEPTH, RENDERS_IN_FLIGHT, observe_stage
+
+
+class RenderQueueFull(Exception):
+    """
+    Raised when a render is refused because the running + queued limit is reached.
+    """
+
+
+class RenderExecutor:
+    """
+    Bounded thread pool for the blocking report pipeline, used from async routes.
+
+    At most `max_concurrent` renders run at once and at most `max_queued` wait
+    behind them; anything beyond that is refused immediately with RenderQueueFull
+    instead of piling up. A slot is only released when the render's thread is
+    really done, so a request that timed out keeps counting until its work ends.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int, timeout: float):
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="report-render")
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self._pending = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return self._pending - self._running
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, submitted: float, fn, *args, **kwargs):
+        observe_stage("render_wait", time.perf_counter() - submitted)
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the render pool and await its result.
+        Raises RenderQueueFull if admission is refused and asyncio.TimeoutError
+        if the render does not finish within the configured timeout.
+        """
+        with self._lock:
+            if self._pending >= self.max_concurrent + self.max_queued:
+                raise RenderQueueFull()
+            self._pending += 1
+
+        try:
+            # Run in a copy of the caller's context, so the render's stages count towards its request
+            context = contextvars.copy_context()
+            call = functools.partial(self._call, time.perf_counter(), fn, *args, **kwargs)
+            future = self._executor.submit(context.run, call)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        # On timeout the wrapped future is cancelled: a queued render never starts,
+        # a running one finishes in the background and then frees its slot.
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+
+
+render_executor = RenderExecutor(
+    max_concurrent=settings.rest_max_concurrent_renders,
+    max_queued=settings.rest_max_queued_renders,
+    timeout=settings.rest_render_timeout_seconds,
+)
+
+RENDERS_IN_FLIGHT.set_function(lambda: render_executor.in_flight)
+RENDER_QUEUE_DEPTH.set_function(lambda: render_executor.queued)
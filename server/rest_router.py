@@ -1,21 +1,36 @@
+import asyncio
+import base64
+import logging
 import os
 from datetime import datetime
-from venv import logger
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.openapi.models import Response
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from config.settings import settings
-from reports.report_generator import generate_manager_report
-from server.service_impl import ReportServiceServicer
-from server.generated import report_pb2
+from data import async_queries
+from data.database import pool_stats
+from dto.job_dto import JobDTO
+from dto.report_dto import ReportFilter
+from jobs.job_runner import get_job_store, submit_job
+from jobs.job_store import JOB_ALL, STATUS_SUCCEEDED
+from reports.batch_generator import iter_manager_reports
+from reports.report_cache import get_report_cache, report_etag
+from reports.report_generator import OUTPUT_HTML, OUTPUT_PDF, cached_report_for_version, generate_manager_report
+from reports.zip_export import iter_manager_reports_zip
+from server.render_executor import RenderQueueFull, render_executor
+from telemetry.metrics import stage
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-report_service = ReportServiceServicer()
+PDF_CHUNK_BYTES = 64 * 1024
 
 security = HTTPBearer()
 
@@ -24,21 +39,115 @@ def validate_token(token: str) -> bool:
     SECRET_KEY = settings.api_key
     return token == SECRET_KEY
 
-def clean_temp():
+def etag_matches(etag: Optional[str], if_none_match: Optional[str]) -> bool:
+    if not etag or not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def pdf_response(pdf: bytes, file_name: str, etag: Optional[str] = None) -> StreamingResponse:
+    """Serves in-memory PDF bytes as a download, in chunks, with an exact Content-Length."""
+    view = memoryview(pdf)
+    headers = {
+        "Content-Length": str(len(pdf)),
+        "Content-Disposition": f'attachment; filename="{file_name}"',
+    }
+    if etag:
+        headers["ETag"] = etag
+    chunks = (view[i:i + PDF_CHUNK_BYTES] for i in range(0, len(view), PDF_CHUNK_BYTES))
+    return StreamingResponse(chunks, media_type="application/pdf", headers=headers)
+
+async def run_render(fn, *args, **kwargs):
+    """Runs a blocking report render on the bounded render pool, off the event loop."""
     try:
-        for item_name in os.listdir(settings.pdf_path):
-            os.remove(os.path.join(settings.pdf_path, item_name))
-        print(f"Cleaned up temporary files: {settings.pdf_path}")
-    except OSError as e:
-        print(f"Error: Failed to delete temporary file {settings.pdf_path}. Error: {e}")
+        return await render_executor.run(fn, *args, **kwargs)
+    except RenderQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many reports are being rendered, retry later.",
+            headers={"Retry-After": str(settings.rest_retry_after_seconds)},
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Report rendering timed out.")
+
+def report_filter_params(
+        from_date: Optional[str] = Query(None, alias="from", description="First day of the report window (YYYY-MM-DD). Monthly hours are limited to the window; employee hours and duration variance stay lifetime totals of the projects with hours in it"),
+        to_date: Optional[str] = Query(None, alias="to", description="Last day of the report window (YYYY-MM-DD)"),
+        project_ids: Optional[List[int]] = Query(None, description="Only these projects; repeat for several"),
+) -> Optional[ReportFilter]:
+    """Optional date range and project filter of the single-manager report routes."""
+    try:
+        return ReportFilter.parse(from_date, to_date, project_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid report filter: {e}")
+
+async def render_manager_report(manager_id: int, version: Optional[str], outputs,
+                                report_filter: Optional[ReportFilter] = None):
+    """
+    Report cache first; on a miss the view data is fetched concurrently on the async
+    engine, so only the CPU-bound render occupies a render pool thread.
+    """
+    report = await run_render(cached_report_for_version, manager_id, version, outputs, report_filter)
+    if report is None:
+        with stage("fetch"):
+            data = await async_queries.fetch_report_data(manager_id, report_filter)
+        report = await run_render(generate_manager_report, manager_id, data=data, version=version, outputs=outputs)
+    return report
 
 class ReportDownload(BaseModel):
     pdf_base64: str
     html_content: str
 
-@router.get("/reports/manager/{manager_id}/pdf", response_class=FileResponse)
-async def get_manager_pdf(manager_id: int, credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Retrieves PDF report bytes (Base64) for a single manager."""
+class ManagerReportDownload(ReportDownload):
+    manager_id: int
+    manager_name: Optional[str] = None
+
+class ManagerReportError(BaseModel):
+    manager_id: int
+    error: str
+
+class BatchReportRequest(BaseModel):
+    manager_ids: Optional[List[int]] = None  # None means every project owner
+
+class JobRequest(BaseModel):
+    manager_id: Optional[int] = None  # None means every project owner
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    manager_id: Optional[int] = None
+    status: str
+    total: int
+    completed: int
+    failed: int
+    progress: float
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result_url: Optional[str] = None
+
+def job_status(job: JobDTO) -> JobStatus:
+    done = job.completed + job.failed
+    return JobStatus(
+        job_id=job.id,
+        kind=job.kind,
+        manager_id=job.manager_id,
+        status=job.status,
+        total=job.total,
+        completed=job.completed,
+        failed=job.failed,
+        progress=done / job.total if job.total else 0.0,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result_url=f"/reports/jobs/{job.id}/result" if job.status == STATUS_SUCCEEDED else None,
+    )
+
+@router.get("/reports/manager/{manager_id}/pdf", response_class=StreamingResponse)
+async def get_manager_pdf(manager_id: int, if_none_match: Optional[str] = Header(None), report_filter: Optional[ReportFilter] = Depends(report_filter_params), credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Retrieves the PDF report for a single manager, optionally limited to a date range and projects. Answers 304 if the If-None-Match ETag is still current."""
     if not validate_token(credentials.credentials):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,20 +156,29 @@ async def get_manager_pdf(manager_id: int, credentials: HTTPAuthorizationCredent
         )
 
     try:
-        response = generate_manager_report(manager_id)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name = response.file_name
-        pdf_path = settings.pdf_path + file_name
+        # Cheap version probe; no view data is fetched for an unchanged report
+        with stage("version_probe"):
+            version = await async_queries.fetch_manager_version(manager_id)
+        etag = report_etag(version, report_filter)
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        response = await render_manager_report(manager_id, version, {OUTPUT_PDF}, report_filter)
+
+        if not response.pdf:
+            raise HTTPException(status_code=404, detail="Report not found or empty.")
 
-        return FileResponse(pdf_path, filename=file_name, media_type='application/pdf')
+        return pdf_response(response.pdf, response.file_name, etag)
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Handle exceptions gracefully
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/reports/manager/{manager_id}/html", response_class=HTMLResponse)
-async def get_manager_html(manager_id: int, credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Retrieves HTML report content for a single manager."""
+async def get_manager_html(manager_id: int, if_none_match: Optional[str] = Header(None), report_filter: Optional[ReportFilter] = Depends(report_filter_params), credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Retrieves HTML report content for a single manager, optionally limited to a date range and projects. Answers 304 if the If-None-Match ETag is still current."""
     if not validate_token(credentials.credentials):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,13 +186,153 @@ async def get_manager_html(manager_id: int, credentials: HTTPAuthorizationCreden
             headers={"WWW-Authenticate": "Bearer"},
         )
     try:
-        manager_request = report_pb2.ManagerRequest(manager_id=manager_id)
-        response = report_service.GetAllReportsOfManager(manager_request, None)
+        with stage("version_probe"):
+            version = await async_queries.fetch_manager_version(manager_id)
+        etag = report_etag(version, report_filter)
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-        if not response.reports or not response.reports[0].html:
+        response = await render_manager_report(manager_id, version, {OUTPUT_HTML}, report_filter)
+
+        if not response.html:
             raise HTTPException(status_code=404, detail="Report not found or empty.")
 
-        return response.reports[0].html # Directly return the HTML string
+        headers = {"ETag": etag} if etag else None
+        return HTMLResponse(response.html, headers=headers)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/reports/managers/batch")
+async def get_manager_reports_batch(body: Optional[BatchReportRequest] = None, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Streams reports for many managers as NDJSON (one ManagerReportDownload per line, or a ManagerReportError line for a manager whose report failed), in completion order."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    manager_ids = body.manager_ids if body else None
+
+    def _stream():
+        for result in iter_manager_reports(manager_ids, outputs={OUTPUT_HTML, OUTPUT_PDF}):
+            if result.error:
+                yield ManagerReportError(manager_id=result.manager_id, error=result.error).model_dump_json() + "\n"
+                continue
+            item = ManagerReportDownload(
+                manager_id=result.manager_id,
+                manager_name=result.manager_name,
+                pdf_base64=base64.b64encode(result.pdf or b"").decode("utf-8"),
+                html_content=result.html,
+            )
+            yield item.model_dump_json() + "\n"
+
+    # Sync generator: Starlette iterates it in its threadpool, off the event loop
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+@router.get("/reports/managers/zip", response_class=StreamingResponse)
+async def get_manager_reports_zip(include_html: bool = False, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Streams a ZIP of every manager's PDF (and HTML with include_html=true), written as the reports finish."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    file_name = f"manager_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    # Sync generator: Starlette iterates it in its threadpool, off the event loop
+    return StreamingResponse(
+        iter_manager_reports_zip(include_html=include_html),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
+
+@router.get("/reports/cache/stats")
+async def get_report_cache_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Hit/miss/eviction counters and sizes of this process's report cache."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    cache = get_report_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/reports/db/stats")
+async def get_db_pool_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Connection pool usage and checkout wait times of this process, per database engine."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return {**pool_stats(), **async_queries.async_pool_stats()}
+
+@router.get("/metrics")
+async def get_metrics(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Prometheus metrics of this process: stage and request latency histograms, render pool and DB pool gauges."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@router.post("/reports/jobs", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(body: Optional[JobRequest] = None, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Queues a background report job for one manager, or for all managers if manager_id is omitted."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    job = await run_in_threadpool(submit_job, body.manager_id if body else None)
+    return job_status(job)
+
+@router.get("/reports/jobs/{job_id}", response_model=JobStatus)
+async def get_report_job(job_id: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Status and progress of a report job."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    job = await run_in_threadpool(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job_status(job)
+
+@router.get("/reports/jobs/{job_id}/result", response_class=FileResponse)
+async def get_report_job_result(job_id: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Downloads a finished job's result: the PDF for a single-manager job, a zip of all PDFs otherwise."""
+    if not validate_token(credentials.credentials):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API Key/Token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    job = await run_in_threadpool(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job.status != STATUS_SUCCEEDED or not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, no result available.")
+
+    media_type = "application/zip" if job.kind == JOB_ALL else "application/pdf"
+    return FileResponse(job.result_path, filename=os.path.basename(job.result_path), media_type=media_type)
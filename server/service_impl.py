@@ -1,27 +1,22 @@
+import hashlib
 import logging
-import os
-from pathlib import Path
-from urllib.parse import urlparse
-import base64
+
+import grpc
 
 from config.settings import settings
 from data.queries import fetch_manager, fetch_all_manager_ids
+from dto.report_dto import ReportFilter
 from server.generated import report_pb2, report_pb2_grpc
+from server.grpc_options import max_message_bytes
+from telemetry.metrics import timed_rpc
 
-from reports.report_generator import generate_manager_report
+from reports.batch_generator import iter_manager_reports
+from reports.html_generator import chart_file_name, compact_html
+from reports.report_generator import ALL_OUTPUTS, OUTPUT_HTML, OUTPUT_PDF, generate_manager_report
 
 logger = logging.getLogger(__name__)
 
 
-def clean_temp():
-    try:
-        for item_name in os.listdir(settings.pdf_path):
-            os.remove(os.path.join(settings.pdf_path, item_name))
-        print(f"Cleaned up temporary files: {settings.pdf_path}")
-    except OSError as e:
-        print(f"Error: Failed to delete temporary file {settings.pdf_path}. Error: {e}")
-
-
 class ReportServiceServicer(report_pb2_grpc.ReportServiceServicer):
     """
     gRPC service implementation for report generation.
@@ -30,63 +25,56 @@ class ReportServiceServicer(report_pb2_grpc.ReportServiceServicer):
     def __init__(self):
         super().__init__()
 
-    def _build_manager_report_package(self, manager_id: int, manager_name: str):
+    def _report_filter(self, request, context):
+        """
+        The optional date range / project filter of a ManagerRequest.
+        Aborts the call with INVALID_ARGUMENT if it is malformed.
+        """
+        try:
+            return ReportFilter.parse(request.from_date, request.to_date, request.project_ids)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Invalid report filter: {e}")
+
+    def _build_manager_report_package(self, manager_id: int, manager_name: str, data=None, outputs=ALL_OUTPUTS,
+                                      report_filter=None, compact=False):
         """
         Calls the pipeline and returns a dict with html, pdf bytes and charts list.
-        Expected pipeline output (dict):
-            {
-              "manager_id": int,
-              "manager_name": str,
-              "html": "<html>...</html>",
-              "pdf_path": "/abs/path/to/pdf",
-              "charts": {"monthly_hours": "/path/to.png", ...}
-            }
+        Only the requested outputs are built; the others come back empty.
         """
-        result = generate_manager_report(manager_id=manager_id)
+        result = generate_manager_report(
+            manager_id=manager_id, data=data, outputs=outputs, report_filter=report_filter
+        )
+        return self._package_report(result, compact)
 
-        # html string
-        html = result.html
-
-        # read pdf bytes
-        pdf_path = result.pdf_path
-        pdf_bytes = b""
-        if pdf_path:
-            try:
-                with open(pdf_path, "rb") as fh:
-                    pdf_bytes = fh.read()
-            except Exception as exc:
-                logger.exception("Failed to read generated pdf at %s: %s", pdf_path, exc)
-
-        # read chart files (if any)
-        charts_out = []
+    def _package_report(self, result, compact=False):
+        """
+        Turns a ReportDTO into a dict with html, pdf bytes and charts list.
+        With `compact`, the charts go out once, as raw image bytes, and the HTML
+        references them by cid:<filename> instead of embedding them.
+        Expected pipeline output (ReportDTO):
+            manager_id: int
+            manager_name: str
+            html: "<html>...</html>"
+            pdf: b"%PDF-..." or None
+            charts: {"monthly_hours": ChartDTO(...), ...}
+        """
         charts = result.charts or {}
-        for key, path in charts.items():
-            if not path:
-                continue
-            try:
-                parsed_uri = urlparse(path)
-                path_segment = parsed_uri.path
-                # Keep the leading slash for absolute paths
-                local_path = Path(path_segment) if path_segment.startswith('/') else Path(path_segment[1:])
-                with open(local_path, "rb") as fh:
-                    data = fh.read()
-            except Exception:
-                logger.exception("Failed to read chart file %s", path)
-                data = b""
-
-            if data:
-                # Convert raw bytes (data) into a Base64 string (bytes)
-                base64_data = base64.b64encode(data)
-            else:
-                base64_data = b""
-            # ----------------------------------------------
 
+        # html string
+        html = compact_html(result.html, charts) if compact and result.html else result.html
+
+        # pdf bytes, rendered in memory
+        pdf_bytes = result.pdf or b""
+
+        # charts are in memory; their base64 form is shared with the HTML, so no file reads or re-encoding
+        charts_out = []
+        for key, chart in charts.items():
             charts_out.append(
                 report_pb2.Chart(
-                    filename=path.split("/")[-1],
+                    filename=chart_file_name(key, chart),
                     title=key,
-                    # Pass the Base64 bytes to the Protobuf message
-                    data=base64_data
+                    # bytes fields need no encoding; base64 is kept only for existing clients
+                    data=chart.data if compact else chart.base64.encode("ascii")
                 )
             )
 
@@ -96,11 +84,17 @@ class ReportServiceServicer(report_pb2_grpc.ReportServiceServicer):
             "charts": charts_out
         }
 
-    def _generate_manager_report_message(self, manager_id: int, manager_name: str) -> report_pb2.ManagerReport:
+    def _generate_manager_report_message(self, manager_id: int, manager_name: str, data=None,
+                                         report_filter=None, compact=False) -> report_pb2.ManagerReport:
+
+        packaged = self._build_manager_report_package(
+            manager_id, manager_name, data, report_filter=report_filter, compact=compact
+        )
+        return self._report_message(manager_id, manager_name, packaged)
 
-        packaged = self._build_manager_report_package(manager_id, manager_name)
+    def _report_message(self, manager_id: int, manager_name: str, packaged: dict) -> report_pb2.ManagerReport:
 
-        # 2. Construct the ManagerReport response message
+        # Construct the ManagerReport response message
         mr = report_pb2.ManagerReport(
             manager_id=manager_id,
             manager_name=manager_name,
@@ -109,7 +103,7 @@ class ReportServiceServicer(report_pb2_grpc.ReportServiceServicer):
             pdf=packaged["pdf"],
         )
 
-        # 3. Add charts to the report message
+        # Add charts to the report message
         for chart in packaged["charts"]:
             mr.charts.add(
                 filename=chart.filename,
@@ -119,45 +113,108 @@ class ReportServiceServicer(report_pb2_grpc.ReportServiceServicer):
 
         return mr
 
+    def _batch_report_message(self, result, compact=False) -> report_pb2.ManagerReport:
+        """
+        ManagerReport for one iter_manager_reports result. A failed manager is still
+        sent, with only `error` set, so callers can tell it apart from a missing one.
+        """
+        manager_name = result.manager_name or f"Manager {result.manager_id}"
+        if result.error:
+            return report_pb2.ManagerReport(manager_id=result.manager_id, manager_name=manager_name, error=result.error)
+        return self._report_message(result.manager_id, manager_name, self._package_report(result, compact))
+
+    @timed_rpc
     def GetManagerHTML(self, request, context):
         manager_id = int(request.manager_id)
-        manager_name = fetch_manager(manager_id)
-        packaged = self._build_manager_report_package(manager_id, manager_name)
+        report_filter = self._report_filter(request, context)
+        packaged = self._build_manager_report_package(manager_id, None, outputs={OUTPUT_HTML}, report_filter=report_filter)
         return report_pb2.HTMLResponse(html=packaged["html"])
 
+    @timed_rpc
     def GetManagerPDF(self, request, context):
         manager_id = request.manager_id
-        manager_name = fetch_manager(manager_id) or f"Manager {manager_id}"
-        packaged = self._build_manager_report_package(manager_id, manager_name)
-        clean_temp()
+        report_filter = self._report_filter(request, context)
+        packaged = self._build_manager_report_package(manager_id, None, outputs={OUTPUT_PDF}, report_filter=report_filter)
+        if len(packaged["pdf"]) > max_message_bytes() - 1024:  # leave room for the message framing
+            context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                f"PDF is {len(packaged['pdf'])} bytes, over the message limit; use StreamManagerPDF",
+            )
         return report_pb2.PDFResponse(pdf=packaged["pdf"])
 
+    @timed_rpc
+    def StreamManagerPDF(self, request, context):
+        manager_id = int(request.manager_id)
+        report_filter = self._report_filter(request, context)
+        result = generate_manager_report(manager_id, outputs={OUTPUT_PDF}, report_filter=report_filter)
+        if not result.pdf:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Report not found or empty.")
+
+        # PDF streams are already deflated; compressing the chunks again only costs CPU
+        context.set_compression(grpc.Compression.NoCompression)
+        yield from self._pdf_chunks(result.pdf, result.file_name)
+
+    def _pdf_chunks(self, pdf: bytes, file_name: str):
+        """
+        Splits a PDF into PDFChunk messages of GRPC_PDF_CHUNK_KB. The last chunk carries
+        the SHA-256 of the whole file so the client can verify what it wrote.
+        """
+        chunk_size = settings.grpc_pdf_chunk_kb * 1024
+        view = memoryview(pdf)
+        digest = hashlib.sha256()
+        for offset in range(0, len(view), chunk_size):
+            data = view[offset:offset + chunk_size]
+            digest.update(data)
+            last = offset + chunk_size >= len(view)
+            yield report_pb2.PDFChunk(
+                data=bytes(data),
+                offset=offset,
+                total_size=len(view),
+                last=last,
+                sha256=digest.hexdigest() if last else "",
+                file_name=file_name if offset == 0 else "",
+            )
+
+    @timed_rpc
     def GetAllReportsOfManager(self, request, context):
         reports = []
         manager_id = int(request.manager_id)
+        report_filter = self._report_filter(request, context)
         manager_name = fetch_manager(manager_id)
-        mr = self._generate_manager_report_message(manager_id, manager_name)
+        mr = self._generate_manager_report_message(
+            manager_id, manager_name, report_filter=report_filter, compact=request.compact
+        )
 
         reports.append(mr)
 
-        clean_temp()
         return report_pb2.AllReportsResponse(reports=reports)
 
+    @timed_rpc
     def GetAllManagerReports(self, request, context):
         all_manager_ids = fetch_all_manager_ids()
         reports = []
 
         if not all_manager_ids:
             print("INFO: No project owners found. Returning empty report list.")
-            clean_temp()
             return report_pb2.AllReportsResponse(reports=[])
 
         print(f"Processing reports for {len(all_manager_ids)} managers...")
 
-        for manager_id in all_manager_ids:
-            manager_name = fetch_manager(manager_id) or f"Manager {manager_id}"
-            mr = self._generate_manager_report_message(manager_id, manager_name)
-            reports.append(mr)
+        # Rendered on the process pool, bulk-fetched per chunk, in completion order
+        for result in iter_manager_reports(all_manager_ids):
+            reports.append(self._batch_report_message(result, request.compact))
 
-        clean_temp()
         return report_pb2.AllReportsResponse(reports=reports)
+
+    @timed_rpc
+    def StreamAllManagerReports(self, request, context):
+        all_manager_ids = fetch_all_manager_ids()
+
+        if not all_manager_ids:
+            print("INFO: No project owners found. Streaming no reports.")
+            return
+
+        print(f"Streaming reports for {len(all_manager_ids)} managers...")
+
+        for result in iter_manager_reports(all_manager_ids):
+            yield self._batch_report_message(result, request.compact)
@@ -0,0 +1 @@
+# Make telemetry a Python package
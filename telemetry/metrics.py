@@ -0,0 +1,241 @@
+"""
+Prometheus metrics and per-request stage timings for the report service.
+
+Every stage of a report (version probe, cache, fetch, charts, html, pdf, ...) is
+timed with `stage(name)` and observed in the report_stage_seconds histogram. Inside
+a `request_timer(...)` block (one per REST request or gRPC call) the stages are also
+collected for that request and written as one JSON line to the "report.timing"
+logger when it ends.
+
+Metrics are per process: the REST app serves them on /metrics, the gRPC server on
+GRPC_METRICS_PORT. Stages run inside batch worker processes are not exported.
+"""
+import inspect
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from prometheus_client import REGISTRY, Gauge, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from config.settings import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REPORT_STAGE_SECONDS = Histogram(
+    "report_stage_seconds",
+    "Time spent in each stage of building a report",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "report_request_seconds",
+    "End-to-end latency of REST requests and gRPC calls",
+    ["protocol", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REPORTS_IN_PROGRESS = Gauge(
+    "report_generations_in_progress",
+    "generate_manager_report calls currently running in this process",
+)
+RENDERS_IN_FLIGHT = Gauge(
+    "render_executor_in_flight",
+    "Renders running on the REST render pool",
+)
+RENDER_QUEUE_DEPTH = Gauge(
+    "render_executor_queue_depth",
+    "Renders admitted to the REST render pool and waiting for a thread",
+)
+
+timing_logger = logging.getLogger("report.timing")
+if not timing_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    timing_logger.addHandler(_handler)
+    timing_logger.setLevel(logging.INFO)
+    timing_logger.propagate = False
+
+# Stage durations of the request being served, if any (shared with render threads
+# through copied contexts)
+_request_stages: ContextVar[Optional[dict]] = ContextVar("request_stages", default=None)
+
+
+def observe_stage(name: str, seconds: float):
+    REPORT_STAGE_SECONDS.labels(name).observe(seconds)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times the enclosed block as report stage `name`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_stages():
+    """
+    Yields a dict that collects {stage: seconds} for every stage timed inside the block.
+    """
+    stages = {}
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+
+@contextmanager
+def request_timer(protocol: str, endpoint: str):
+    """
+    Times one request or call. Yields a dict whose "status" and "endpoint" the caller
+    may set (status defaults to "ok", or "error" if the block raises); extra keys end
+    up in the log line.
+    """
+    record = {"status": "ok", "endpoint": endpoint}
+    start = time.perf_counter()
+    try:
+        with collect_stages() as stages:
+            yield record
+    except BaseException:
+        if record["status"] == "ok":
+            record["status"] = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        status = str(record.pop("status"))
+        endpoint = str(record.pop("endpoint"))
+        REQUEST_SECONDS.labels(protocol, endpoint, status).observe(elapsed)
+        if settings.timing_log_enabled:
+            timing_logger.info(json.dumps({
+                "event": "request_timing",
+                "protocol": protocol,
+                "endpoint": endpoint,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+                "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in stages.items()},
+                **record,
+            }, default=str))
+
+
+def _rpc_status(context, error: BaseException) -> str:
+    if isinstance(error, GeneratorExit):
+        return "CANCELLED"  # the client stopped reading the stream
+    code = context.code() if hasattr(context, "code") else None
+    return code.name if code is not None else "error"  # set by context.abort()
+
+
+def timed_rpc(method):
+    """
+    Decorator for ReportServiceServicer RPCs: a request_timer around the call, or
+    around the whole stream for server-streaming methods. Failed calls are labelled
+    with the status code they were aborted with.
+    """
+    if inspect.isgeneratorfunction(method):
+        @wraps(method)
+        def stream_wrapper(self, request, context):
+            with request_timer("grpc", method.__name__) as record:
+                try:
+                    yield from method(self, request, context)
+                except BaseException as e:
+                    record["status"] = _rpc_status(context, e)
+                    raise
+        return stream_wrapper
+
+    @wraps(method)
+    def wrapper(self, request, context):
+        with request_timer("grpc", method.__name__) as record:
+            try:
+                return method(self, request, context)
+            except BaseException as e:
+                record["status"] = _rpc_status(context, e)
+                raise
+    return wrapper
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware for the REST app: a request_timer per HTTP request, labelled by
+    route template and response status. It wraps the whole ASGI call, so streamed
+    bodies (PDF, batch NDJSON, ZIP) are timed until their last chunk is sent, not
+    only until the headers go out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_timer("http", "unmatched") as record:
+            async def timed_send(message):
+                if message["type"] == "http.response.start":
+                    record["status"] = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, timed_send)
+            finally:
+                route = scope.get("route")  # set by the router once a route matched
+                if route is not None:
+                    record["endpoint"] = f"{scope['method']} {route.path}"
+
+
+class _DatabasePoolCollector:
+    """
+    Exports data.database.pool_stats() at scrape time, one label per engine.
+    """
+
+    def collect(self):
+        from data.async_queries import async_pool_stats
+        from data.database import pool_stats
+
+        gauges = {
+            name: GaugeMetricFamily(f"db_pool_{name}", help_text, labels=["engine"])
+            for name, help_text in (
+                ("size", "Configured pool size"),
+                ("checkedout", "Connections currently checked out"),
+                ("checkedin", "Idle connections in the pool"),
+                ("overflow", "Connections open beyond the pool size"),
+            )
+        }
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Connection checkouts", labels=["engine"])
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Checkouts that timed out", labels=["engine"])
+        max_wait = GaugeMetricFamily("db_pool_checkout_wait_max_seconds", "Longest checkout wait", labels=["engine"])
+
+        for engine_name, stats in {**pool_stats(), **async_pool_stats()}.items():
+            for name, gauge in gauges.items():
+                if name in stats:
+                    gauge.add_metric([engine_name], stats[name])
+            if "checkouts" in stats:  # checkout waits are only measured by data.database.connect
+                checkouts.add_metric([engine_name], stats["checkouts"])
+                timeouts.add_metric([engine_name], stats["timeouts"])
+                max_wait.add_metric([engine_name], stats["max_wait_ms"] / 1000)
+
+        yield from gauges.values()
+        yield checkouts
+        yield timeouts
+        yield max_wait
+
+
+REGISTRY.register(_DatabasePoolCollector())
+
+
+def start_metrics_server(port: int, addr: str = "0.0.0.0"):
+    """
+    Serves /metrics on its own HTTP port, for processes without the FastAPI app.
+    """
+    start_http_server(port, addr=addr)